@@ -0,0 +1,113 @@
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable
+
+from app.core.config import settings
+from app.core.telemetry import metrics_registry
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class InferenceLane:
+    def __init__(self, name: str, max_concurrency: int, max_queue: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.capacity = max_concurrency + max_queue
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"{name}-inference")
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.avg_service_time = 1.0
+
+    def admit(self):
+        with self.lock:
+            if self.pending >= self.capacity:
+                self.rejected += 1
+                raise AdmissionRejected(f"The {self.name} inference queue is full, try again later",
+                                        self.retry_after())
+            self.pending += 1
+
+    def release(self, service_time: float):
+        with self.lock:
+            self.pending -= 1
+            self.completed += 1
+            self.avg_service_time = 0.9 * self.avg_service_time + 0.1 * service_time
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.pending / self.max_concurrency * self.avg_service_time))
+
+    def timed(self, fn: Callable, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.release(time.perf_counter() - start)
+
+    async def run(self, fn: Callable, *args):
+        self.admit()
+        try:
+            future = self.executor.submit(self.timed, fn, *args)
+        except BaseException:
+            self.release(0.0)
+            raise
+
+        return await asyncio.wrap_future(future)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "pending": self.pending,
+                "capacity": self.capacity,
+                "max_concurrency": self.max_concurrency,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_service_ms": round(self.avg_service_time * 1000, 3),
+            }
+
+
+class TokenBucketLimiter:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.lock = threading.Lock()
+        self.buckets: Dict[Hashable, tuple] = {}
+
+    def acquire(self, key: Hashable, cost: float = 1.0):
+        if self.rate <= 0:
+            return
+
+        with self.lock:
+            now = time.monotonic()
+            tokens, updated_at = self.buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+
+            if tokens < cost:
+                self.buckets[key] = (tokens, now)
+                raise AdmissionRejected("Rate limit exceeded, try again later",
+                                        max(1, math.ceil((cost - tokens) / self.rate)))
+
+            self.buckets[key] = (tokens - cost, now)
+
+
+inference_lanes = {
+    "analysis": InferenceLane("analysis", settings.INFERENCE_WORKERS, settings.INFERENCE_QUEUE_SIZE),
+    "batch": InferenceLane("batch", settings.BATCH_INFERENCE_WORKERS, settings.BATCH_INFERENCE_QUEUE_SIZE),
+    "labels": InferenceLane("labels", settings.PRIORITY_INFERENCE_WORKERS, settings.PRIORITY_INFERENCE_QUEUE_SIZE),
+}
+
+metrics_registry.gauge("inference_lane_pending", "Requests running or queued in each inference lane", ("lane",),
+                       lambda: {(name,): lane.pending for name, lane in inference_lanes.items()})
+
+rate_limiter = TokenBucketLimiter(settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST)
+
+
+async def run_inference(lane: str, fn: Callable, *args):
+    return await inference_lanes[lane].run(fn, *args)
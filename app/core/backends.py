@@ -0,0 +1,171 @@
+import argparse
+import copy
+import hashlib
+import os
+import tempfile
+from typing import Any, Dict, List
+
+import torch
+
+from app.core.config import settings
+from app.core.registry import model_registry
+
+BACKENDS = ["torch", "quantized", "onnx"]
+
+SAMPLE_TEXTS = [
+    "John Smith moved to London in March 2021 to work for the United Nations.",
+    "Please contact me at jane.doe@example.com or call 555-0134 after 6pm.",
+    "The service was terrible and nobody answered my emails for two weeks.",
+    "I really enjoyed the concert last night, the band was fantastic!",
+]
+
+
+class LogitsOnly(torch.nn.Module):
+    def __init__(self, model: torch.nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids).logits
+
+
+def tensor_bytes(value: Any) -> int:
+    if isinstance(value, torch.Tensor):
+        return value.numel() * value.element_size()
+    if isinstance(value, (tuple, list)):
+        return sum(tensor_bytes(item) for item in value)
+
+    return 0
+
+
+class TorchBackend:
+    def __init__(self, model: torch.nn.Module, device: torch.device):
+        self.model = model
+        self.device = device
+
+    def memory_bytes(self) -> int:
+        return sum(tensor_bytes(value) for value in self.model.state_dict().values())
+
+    def __call__(self, encoding: Dict[str, torch.Tensor]) -> torch.Tensor:
+        encoding = {key: val.to(self.device) for key, val in encoding.items()}
+
+        with torch.no_grad():
+            return self.model(**encoding).logits
+
+
+class QuantizedTorchBackend(TorchBackend):
+    def __init__(self, model: torch.nn.Module, device: torch.device):
+        quantized_model = torch.quantization.quantize_dynamic(model.to("cpu"), {torch.nn.Linear}, dtype=torch.qint8,
+                                                              inplace=True)
+        super().__init__(quantized_model, torch.device("cpu"))
+
+
+class OnnxBackend:
+    def __init__(self, model: torch.nn.Module, name: str, token_level: bool):
+        import onnxruntime
+
+        path = onnx_model_path(name)
+        if not os.path.exists(path):
+            export_onnx(model, path, token_level)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+        self.weights_bytes = os.path.getsize(path)
+
+    def memory_bytes(self) -> int:
+        return self.weights_bytes
+
+    def __call__(self, encoding: Dict[str, torch.Tensor]) -> torch.Tensor:
+        feeds = {name: encoding[name].cpu().numpy() for name in self.input_names}
+
+        return torch.from_numpy(self.session.run(["logits"], feeds)[0])
+
+
+def onnx_model_path(name: str) -> str:
+    source = f"{settings.MODEL_VERSION}\0{getattr(settings, f'{name.upper()}_MODEL_PATH')}"
+    digest = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+    return os.path.join(settings.ONNX_MODEL_DIR, f"{name}-{digest}.onnx")
+
+
+def export_onnx(model: torch.nn.Module, path: str, token_level: bool):
+    device = next(model.parameters()).device
+    input_names = ["input_ids", "attention_mask", "token_type_ids"]
+    dummy_input = (
+        torch.ones(1, 8, dtype=torch.long, device=device),
+        torch.ones(1, 8, dtype=torch.long, device=device),
+        torch.zeros(1, 8, dtype=torch.long, device=device),
+    )
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch", 1: "sequence"} if token_level else {0: "batch"}
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".onnx.tmp")
+    os.close(descriptor)
+
+    try:
+        torch.onnx.export(LogitsOnly(model).eval(), dummy_input, temp_path, input_names=input_names,
+                          output_names=["logits"], dynamic_axes=dynamic_axes, opset_version=14)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def create_backend(kind: str, model: torch.nn.Module, name: str, device: torch.device, token_level: bool):
+    if kind == "torch":
+        return TorchBackend(model, device)
+    if kind == "quantized":
+        return QuantizedTorchBackend(model, device)
+    if kind == "onnx":
+        return OnnxBackend(model, name, token_level)
+
+    raise ValueError(f"Unknown inference backend '{kind}' for {name}, expected one of {BACKENDS}")
+
+
+def load_models() -> dict:
+    for name in model_registry.loaders:
+        setattr(settings, f"{name.upper()}_BACKEND", "torch")
+
+    return {name: model_registry.get(name) for name in model_registry.loaders if model_registry.enabled(name)}
+
+
+def export(models: dict):
+    for name, model in models.items():
+        path = onnx_model_path(name)
+        export_onnx(model.model, path, token_level=name != "sentiment")
+        print(f"{name}: exported to {path}")
+
+
+def verify(models: dict, texts: List[str]):
+    for name, model in models.items():
+        inputs = [model.text_cleaner(text) for text in texts] if name == "sentiment" else texts
+        encoding = model.tokenizer(inputs, return_tensors="pt", truncation=True, padding=True, max_length=512)
+        reference = TorchBackend(model.model, model.device)(encoding).argmax(dim=-1).cpu()
+        mask = encoding["attention_mask"].bool() if reference.dim() == 2 else torch.ones_like(reference).bool()
+
+        for kind in BACKENDS[1:]:
+            source_model = copy.deepcopy(model.model) if kind == "quantized" else model.model
+            backend = create_backend(kind, source_model, name, model.device, token_level=name != "sentiment")
+            predictions = backend(encoding).argmax(dim=-1).cpu()
+            agreement = (predictions == reference)[mask].float().mean().item()
+            print(f"{name}: {kind} label agreement with fp32 = {agreement * 100:.2f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export and verify CPU inference backends")
+    parser.add_argument("command", choices=["export", "verify"])
+    parser.add_argument("--texts", help="file with one sample text per line, used by verify")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export(load_models())
+    else:
+        sample_texts = SAMPLE_TEXTS
+        if args.texts:
+            with open(args.texts, encoding="utf-8") as texts_file:
+                sample_texts = [line.strip() for line in texts_file if line.strip()]
+        verify(load_models(), sample_texts)
@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from queue import Queue, Empty
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.core.config import settings
+from app.core.telemetry import metrics_registry, stage_seconds
+
+
+class BatchStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.max_batch_size = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+
+    def record(self, batch_size: int, queue_waits: List[float]):
+        with self.lock:
+            self.batches += 1
+            self.items += batch_size
+            self.max_batch_size = max(self.max_batch_size, batch_size)
+            self.total_queue_wait += sum(queue_waits)
+            self.max_queue_wait = max(self.max_queue_wait, *queue_waits)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "avg_queue_wait_ms": round(self.total_queue_wait / self.items * 1000, 3) if self.items else 0.0,
+                "max_queue_wait_ms": round(self.max_queue_wait * 1000, 3),
+            }
+
+
+class MicroBatcher:
+    def __init__(self, name: str, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = settings.BATCH_MAX_SIZE, max_wait_ms: float = settings.BATCH_MAX_WAIT_MS):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.stats = BatchStats()
+        self.reset()
+        os.register_at_fork(after_in_child=self.reset)
+        batchers[name] = self
+
+    def reset(self):
+        self.queue: Queue[Tuple[Any, Future, float]] = Queue()
+        self.worker = None
+        self.worker_lock = threading.Lock()
+
+    def submit(self, item: Any) -> Any:
+        self.ensure_worker()
+
+        future = Future()
+        self.queue.put((item, future, time.perf_counter()))
+
+        return future.result()
+
+    def ensure_worker(self):
+        if self.worker is not None and self.worker.is_alive():
+            return
+
+        with self.worker_lock:
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self.run, name=f"{self.name}-batcher", daemon=True)
+                self.worker.start()
+
+    def collect(self) -> List[Tuple[Any, Future, float]]:
+        batch = [self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except Empty:
+                break
+
+        return batch
+
+    def run(self):
+        while True:
+            batch = self.collect()
+            started = time.perf_counter()
+            queue_waits = [started - enqueued for _, _, enqueued in batch]
+            self.stats.record(len(batch), queue_waits)
+            for queue_wait in queue_waits:
+                stage_seconds.observe(queue_wait, model=self.name, stage="queue")
+
+            try:
+                results = self.batch_fn([item for item, _, _ in batch])
+                if len(results) != len(batch):
+                    raise ValueError(f"{self.name} returned {len(results)} results for a batch of {len(batch)}")
+            except Exception:
+                for item, future, _ in batch:
+                    self.run_single(item, future)
+                continue
+
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def run_single(self, item: Any, future: Future):
+        try:
+            results = self.batch_fn([item])
+            if len(results) != 1:
+                raise ValueError(f"{self.name} returned {len(results)} results for a single item")
+        except Exception as exc:
+            future.set_exception(exc)
+            return
+
+        future.set_result(results[0])
+
+
+batchers: Dict[str, MicroBatcher] = {}
+
+metrics_registry.gauge("batcher_queue_depth", "Items waiting in each model's micro-batch queue", ("model",),
+                       lambda: {(name,): batcher.queue.qsize() for name, batcher in batchers.items()})
@@ -0,0 +1,85 @@
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+import torch
+
+from app.core.config import settings
+from app.core.telemetry import tokens_processed
+
+MODEL_INPUTS = ("input_ids", "attention_mask", "token_type_ids")
+MIN_BUCKET_WIDTH = 16
+
+
+class PaddingStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.lock = threading.Lock()
+        self.real_tokens = 0
+        self.padded_tokens = 0
+
+    def record(self, real_tokens: int, padded_tokens: int):
+        with self.lock:
+            self.real_tokens += real_tokens
+            self.padded_tokens += padded_tokens
+
+        tokens_processed.inc(real_tokens, model=self.name, kind="real")
+        tokens_processed.inc(padded_tokens, model=self.name, kind="padded")
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "real_tokens": self.real_tokens,
+                "padded_tokens": self.padded_tokens,
+                "padding_efficiency": round(self.real_tokens / self.padded_tokens, 4) if self.padded_tokens else 1.0,
+            }
+
+
+def length_buckets(lengths: np.ndarray, max_batch_size: int = settings.BATCH_MAX_SIZE,
+                   max_tokens: int = settings.BUCKET_MAX_TOKENS,
+                   length_ratio: float = settings.BUCKET_LENGTH_RATIO) -> List[np.ndarray]:
+    order = np.argsort(lengths, kind="stable")
+    buckets = []
+    start = 0
+
+    for end in range(1, len(order) + 1):
+        if end == len(order):
+            buckets.append(order[start:end])
+            break
+
+        rows = end - start
+        next_length = lengths[order[end]]
+        if rows == max_batch_size or (rows + 1) * next_length > max_tokens or \
+                next_length > length_ratio * max(lengths[order[start]], MIN_BUCKET_WIDTH):
+            buckets.append(order[start:end])
+            start = end
+
+    return buckets
+
+
+def pad_rows(rows: Sequence[Sequence], indices: np.ndarray, width: int, fill) -> np.ndarray:
+    first = np.asarray(rows[indices[0]])
+    padded = np.full((len(indices), width) + first.shape[1:], fill, dtype=np.int64)
+
+    for row, index in enumerate(indices):
+        values = np.asarray(rows[index], dtype=np.int64)
+        padded[row, :len(values)] = values
+
+    return padded
+
+
+def run_bucketed(backend: Callable[[Dict[str, torch.Tensor]], torch.Tensor], encoding, pad_token_id: int,
+                 stats: PaddingStats) -> List[Tuple[np.ndarray, torch.Tensor]]:
+    lengths = np.array([len(input_ids) for input_ids in encoding["input_ids"]])
+    outputs = []
+
+    for indices in length_buckets(lengths):
+        width = int(lengths[indices].max())
+        batch = {
+            key: torch.from_numpy(pad_rows(encoding[key], indices, width, pad_token_id if key == "input_ids" else 0))
+            for key in MODEL_INPUTS if key in encoding
+        }
+        stats.record(int(lengths[indices].sum()), len(indices) * width)
+        outputs.append((indices, backend(batch)))
+
+    return outputs
@@ -0,0 +1,103 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable
+
+from app.core.config import settings
+
+
+class CacheStats:
+    def __init__(self, counters: Iterable[str] = ("memory_hits", "persistent_hits", "misses", "evictions")):
+        self.lock = threading.Lock()
+        self.counters = dict.fromkeys(counters, 0)
+
+    def increment(self, counter: str):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return dict(self.counters)
+
+
+class LRUCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self.stats = CacheStats()
+
+    def get(self, key: Hashable) -> Any:
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+
+            return self.entries[key]
+
+    def put(self, key: Hashable, value: Any):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.stats.increment("evictions")
+
+    def discard(self, key: Hashable):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            size = len(self.entries)
+
+        return {**self.stats.snapshot(), "size": size, "max_size": self.max_size}
+
+
+class TTLCache(LRUCache):
+    def __init__(self, max_size: int, ttl_seconds: float):
+        super().__init__(max_size)
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats(("hits", "misses", "expirations", "evictions"))
+
+    def get(self, key: Hashable) -> Any:
+        entry = super().get(key)
+        if entry is None:
+            self.stats.increment("misses")
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self.discard(key)
+            self.stats.increment("expirations")
+            self.stats.increment("misses")
+            return None
+
+        self.stats.increment("hits")
+
+        return value
+
+    def put(self, key: Hashable, value: Any, ttl_seconds: float | None = None):
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl_seconds > 0:
+            super().put(key, (time.monotonic() + ttl_seconds, value))
+
+
+def model_versions() -> str:
+    return "|".join([settings.MODEL_VERSION, settings.SENTIMENT_MODEL_PATH, settings.PII_MODEL_PATH,
+                     settings.NER_MODEL_PATH, settings.POS_MODEL_PATH, settings.SENTIMENT_BACKEND,
+                     settings.PII_BACKEND, settings.NER_BACKEND, settings.POS_BACKEND,
+                     str(settings.SENTIMENT_ENABLED), str(settings.PII_ENABLED), str(settings.NER_ENABLED),
+                     str(settings.POS_ENABLED), str(settings.SLIDING_WINDOW), str(settings.WINDOW_MAX_LENGTH),
+                     str(settings.WINDOW_OVERLAP)])
+
+
+def hash_corpus(corpus: str) -> str:
+    return hashlib.sha256(f"{model_versions()}\0{corpus}".encode("utf-8")).hexdigest()
+
+
+analysis_cache = LRUCache(settings.CACHE_MAX_ENTRIES)
+token_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+user_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
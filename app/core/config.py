@@ -5,6 +5,7 @@ class Settings(BaseSettings):
     PROJECT_NAME: str
     PROJECT_VERSION: str
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: str | None = None
     SENTIMENT_MODEL_PATH: str
     SENTIMENT_TOKENIZER_PATH: str
     NER_MODEL_PATH: str
@@ -14,6 +15,52 @@ class Settings(BaseSettings):
     POS_MODEL_PATH: str
     POS_TOKENIZER_PATH: str
     TOKEN_KEY: str
+    BATCH_MAX_SIZE: int = 16
+    BATCH_MAX_WAIT_MS: float = 5.0
+    BUCKET_MAX_TOKENS: int = 8192
+    BUCKET_LENGTH_RATIO: float = 2.0
+    PIPELINE_WORKERS: int = 32
+    INFERENCE_WORKERS: int = 4
+    INFERENCE_QUEUE_SIZE: int = 32
+    BATCH_INFERENCE_WORKERS: int = 2
+    BATCH_INFERENCE_QUEUE_SIZE: int = 8
+    PRIORITY_INFERENCE_WORKERS: int = 4
+    PRIORITY_INFERENCE_QUEUE_SIZE: int = 64
+    RATE_LIMIT_PER_SECOND: float = 0.0
+    RATE_LIMIT_BURST: int = 20
+    WEB_WORKERS: int = 4
+    TORCH_THREADS_PER_WORKER: int = 0
+    JOB_QUEUE: str = "inprocess"
+    JOB_WORKERS: int = 2
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_TIMEOUT_SECONDS: float = 600.0
+    JOB_POLL_INTERVAL: float = 1.0
+    JOB_MAX_ACTIVE_PER_USER: int = 5
+    MODEL_VERSION: str = "1"
+    CACHE_MAX_ENTRIES: int = 10000
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_CACHE_TTL_SECONDS: float = 60.0
+    SENTIMENT_BACKEND: str = "torch"
+    NER_BACKEND: str = "torch"
+    PII_BACKEND: str = "torch"
+    POS_BACKEND: str = "torch"
+    ONNX_MODEL_DIR: str = "onnx"
+    SLIDING_WINDOW: bool = True
+    WINDOW_MAX_LENGTH: int = 512
+    WINDOW_OVERLAP: int = 128
+    SENTIMENT_ENABLED: bool = True
+    NER_ENABLED: bool = True
+    PII_ENABLED: bool = True
+    POS_ENABLED: bool = True
+    WARMUP_MODELS: bool = True
+    NLTK_DATA_PATH: str | None = None
+    NLTK_AUTO_DOWNLOAD: bool = True
+    LABEL_STORAGE: str = "rows"
+    PAGE_DEFAULT_SIZE: int = 50
+    PAGE_MAX_SIZE: int = 200
+    TRACE_EXPORTER: str = "none"
+    TRACE_FILE_PATH: str = "traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
 
     class Config:
         case_sensitive = True
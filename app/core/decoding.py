@@ -0,0 +1,89 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import torch
+
+from app.core.bucketing import pad_rows
+
+
+def label_names_from_map(reverse_tags_map: Dict[int, str]) -> np.ndarray:
+    return np.array([reverse_tags_map[index] for index in range(len(reverse_tags_map))], dtype=object)
+
+
+def word_ids_array(encoding, indices: np.ndarray, width: int) -> np.ndarray:
+    word_ids = [[-1 if word_id is None else word_id for word_id in encoding.word_ids(int(index))] for index in indices]
+
+    return pad_rows(word_ids, np.arange(len(indices)), width, -1)
+
+
+def window_sample_mapping(encoding, batch_size: int) -> np.ndarray:
+    if "overflow_to_sample_mapping" in encoding:
+        return np.asarray(encoding.pop("overflow_to_sample_mapping"))
+
+    return np.arange(batch_size)
+
+
+def merge_bucket_logits(bucket_outputs: List[Tuple[np.ndarray, torch.Tensor]]) -> torch.Tensor:
+    logits = torch.cat([bucket_logits for _, bucket_logits in bucket_outputs])
+    order = torch.from_numpy(np.argsort(np.concatenate([indices for indices, _ in bucket_outputs])))
+
+    return logits[order.to(logits.device)]
+
+
+def pool_window_logits(logits: torch.Tensor, sample_mapping: np.ndarray, sample_count: int) -> torch.Tensor:
+    index = torch.from_numpy(sample_mapping).to(logits.device)
+    pooled = torch.zeros(sample_count, logits.shape[-1], dtype=logits.dtype, device=logits.device)
+    counts = torch.bincount(index, minlength=sample_count).clamp(min=1).unsqueeze(-1)
+
+    return pooled.index_add_(0, index, logits) / counts
+
+
+def decode_bucket(indices: np.ndarray, logits: torch.Tensor, encoding) -> Tuple[np.ndarray, ...]:
+    word_ids = word_ids_array(encoding, indices, logits.shape[1])
+    valid = word_ids >= 0
+
+    max_logits, predictions = logits.max(dim=-1)
+    probabilities = torch.exp(logits - max_logits.unsqueeze(-1)).sum(dim=-1).reciprocal()
+    decoded = torch.stack([predictions.to(probabilities.dtype), probabilities])
+    decoded = decoded[:, torch.from_numpy(valid).to(logits.device)].cpu().numpy()
+
+    rows, positions = np.nonzero(valid)
+    contexts = np.minimum(positions, valid.sum(axis=1)[rows] + 1 - positions)
+    spans = pad_rows(encoding["offset_mapping"], indices, logits.shape[1], 0)[valid]
+
+    return indices[rows], contexts, word_ids[valid], spans, decoded[0].astype(np.int64), decoded[1].astype(np.float64)
+
+
+def decode_token_labels(bucket_outputs: List[Tuple[np.ndarray, torch.Tensor]], encoding,
+                        sample_mapping: np.ndarray, texts: List[str], label_names: np.ndarray) -> List[List[dict]]:
+    decoded_rows = [[] for _ in range(len(texts))]
+    decoded_buckets = [decode_bucket(indices, logits, encoding) for indices, logits in bucket_outputs]
+    if not decoded_buckets:
+        return decoded_rows
+
+    windows, contexts, words, spans, predictions, probabilities = map(np.concatenate, zip(*decoded_buckets))
+    if not len(words):
+        return decoded_rows
+
+    word_starts = np.flatnonzero(np.r_[True, (windows[1:] != windows[:-1]) | (words[1:] != words[:-1])])
+    window_ends = np.maximum.reduceat(spans[:, 1], word_starts)
+    samples = sample_mapping[windows[word_starts]]
+    words, contexts = words[word_starts], contexts[word_starts]
+    starts, predictions, probabilities = spans[word_starts, 0], predictions[word_starts], probabilities[word_starts]
+
+    order = np.lexsort((-contexts, words, samples))
+    samples, words, starts, window_ends = samples[order], words[order], starts[order], window_ends[order]
+    predictions, probabilities = predictions[order], probabilities[order]
+
+    groups = np.flatnonzero(np.r_[True, (samples[1:] != samples[:-1]) | (words[1:] != words[:-1])])
+    starts = np.minimum.reduceat(starts, groups)
+    ends = np.maximum.reduceat(window_ends, groups)
+    labels = label_names[predictions[groups]]
+    probs = np.round(probabilities[groups] * 100, 2)
+
+    for row, start, end, label, prob in zip(samples[groups].tolist(), starts.tolist(), ends.tolist(),
+                                            labels.tolist(), probs.tolist()):
+        decoded_rows[row].append({"token": texts[row][start:end], "label": label, "prob": prob,
+                                  "start": start, "end": end})
+
+    return decoded_rows
@@ -0,0 +1,38 @@
+import queue
+import time
+from uuid import UUID
+
+JOB_QUEUES = ["inprocess", "database"]
+
+
+class InProcessJobQueue:
+    def __init__(self):
+        self.queue = queue.Queue()
+
+    def put(self, job_id: UUID):
+        self.queue.put(job_id)
+
+    def take(self, timeout: float) -> UUID | None:
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class DatabaseJobQueue:
+    def put(self, job_id: UUID):
+        pass
+
+    def take(self, timeout: float) -> UUID | None:
+        time.sleep(timeout)
+
+        return None
+
+
+def create_job_queue(kind: str):
+    if kind == "inprocess":
+        return InProcessJobQueue()
+    if kind == "database":
+        return DatabaseJobQueue()
+
+    raise ValueError(f"Unknown job queue '{kind}', expected one of {JOB_QUEUES}")
@@ -1,17 +1,48 @@
-import nltk
-from rake_nltk import Rake
+from functools import lru_cache
 
-nltk.download('stopwords')
-nltk.download('punkt')
+from app.core.config import settings
+from app.core.telemetry import stage_timer
+
+NLTK_RESOURCES = {"stopwords": "corpora/stopwords", "punkt": "tokenizers/punkt", "punkt_tab": "tokenizers/punkt_tab"}
+
+
+@lru_cache(maxsize=None)
+def load_rake():
+    import nltk
+    from rake_nltk import Rake
+
+    if settings.NLTK_DATA_PATH and settings.NLTK_DATA_PATH not in nltk.data.path:
+        nltk.data.path.insert(0, settings.NLTK_DATA_PATH)
+
+    for resource, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError as exc:
+            if not settings.NLTK_AUTO_DOWNLOAD:
+                raise LookupError(f"NLTK resource '{resource}' is missing and NLTK_AUTO_DOWNLOAD is disabled, "
+                                  f"bundle it with `python -m app.core.key_phrases`") from exc
+            if not nltk.download(resource, download_dir=settings.NLTK_DATA_PATH, quiet=True):
+                raise LookupError(f"NLTK resource '{resource}' is missing and could not be downloaded, "
+                                  f"bundle it with `python -m app.core.key_phrases`") from exc
+
+    return Rake
 
 
 def extract_key_phrases(text):
-    rake_nltk_var = Rake()
+    rake_nltk_var = load_rake()()
 
-    rake_nltk_var.extract_keywords_from_text(text)
+    with stage_timer("key_phrases", "rake"):
+        rake_nltk_var.extract_keywords_from_text(text)
 
-    ranked_phrases_with_scores = rake_nltk_var.get_ranked_phrases_with_scores()
+        ranked_phrases_with_scores = rake_nltk_var.get_ranked_phrases_with_scores()
 
     key_phrases = [{"score": score, "phrase": phrase} for score, phrase in ranked_phrases_with_scores]
 
     return key_phrases
+
+
+if __name__ == "__main__":
+    import nltk
+
+    for nltk_resource in NLTK_RESOURCES:
+        nltk.download(nltk_resource, download_dir=settings.NLTK_DATA_PATH)
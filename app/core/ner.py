@@ -1,16 +1,22 @@
+from typing import List
+
 import torch
-from torch.nn.functional import softmax
 from transformers import BertForTokenClassification
-from transformers import BertTokenizer
+from transformers import BertTokenizerFast
 
+from app.core.backends import create_backend
+from app.core.batching import MicroBatcher
+from app.core.bucketing import PaddingStats, run_bucketed
 from app.core.config import settings
+from app.core.decoding import decode_token_labels, label_names_from_map, window_sample_mapping
+from app.core.telemetry import stage_timer
 
 
 class NerModel:
     def __init__(self):
         self.model = BertForTokenClassification.from_pretrained(
             settings.NER_MODEL_PATH)
-        self.tokenizer = BertTokenizer.from_pretrained(
+        self.tokenizer = BertTokenizerFast.from_pretrained(
             settings.NER_TOKENIZER_PATH)
 
         self.tags_map = {'O': 0, 'I-ORG': 1, 'I-PER': 2, 'B-GPE': 3, 'I-GPE': 4, 'B-PER': 5, 'I-ART': 6, 'I-TIM': 7,
@@ -19,49 +25,35 @@ class NerModel:
                          'B-ORG': 16}
 
         self.reverse_tags_map = {v: k for k, v in self.tags_map.items()}
+        self.label_names = label_names_from_map(self.reverse_tags_map)
 
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.model.to(self.device)
         self.model.eval()
 
-    def predict_labels(self, text: str):
-        tokenized_input = self.tokenizer(text, return_tensors="pt", truncation=True, padding=True, max_length=512,
-                                         is_split_into_words=False)
-
-        tokenized_input = {key: val.to(self.device) for key, val in tokenized_input.items()}
-
-        with torch.no_grad():
-            output = self.model(**tokenized_input)
+        self.backend = create_backend(settings.NER_BACKEND, self.model, "ner", self.device, token_level=True)
+        self.model = getattr(self.backend, "model", None)
+        self.padding_stats = PaddingStats("ner")
+        self.batcher = MicroBatcher("ner", self.predict_labels_batch)
 
-        probabilities = softmax(output.logits, dim=-1)
-
-        predictions = torch.argmax(probabilities, dim=-1)
-
-        tokens = self.tokenizer.convert_ids_to_tokens(tokenized_input["input_ids"][0])
-        predicted_labels = [self.reverse_tags_map[pred.item()] for pred in predictions[0]]
-        predicted_probs = [prob[pred].item() for prob, pred in zip(probabilities[0], predictions[0])]
+    def predict_labels(self, text: str):
+        return self.batcher.submit(text)
 
-        ner_list = []
-        current_word = ""
-        current_label = None
-        current_prob = None
+    def warmup(self, text: str):
+        self.predict_labels_batch([text])
 
-        for token, label, prob in zip(tokens, predicted_labels, predicted_probs):
-            if token in ['[CLS]', '[SEP]']:
-                continue
-            if token.startswith("##"):
-                current_word += token[2:]
-            else:
-                if current_word:
-                    ner_list.append(
-                        {"token": current_word, "label": current_label, "prob": round(current_prob * 100, 2)})
-                current_word = token
-                current_label = label
-                current_prob = prob
-        if current_word:
-            ner_list.append({"token": current_word, "label": current_label, "prob": round(current_prob * 100, 2)})
+    def predict_labels_batch(self, texts: List[str]):
+        with stage_timer("ner", "tokenize"):
+            tokenized_input = self.tokenizer(texts, truncation=True, max_length=settings.WINDOW_MAX_LENGTH,
+                                             stride=settings.WINDOW_OVERLAP,
+                                             return_overflowing_tokens=settings.SLIDING_WINDOW,
+                                             return_offsets_mapping=True)
+            sample_mapping = window_sample_mapping(tokenized_input, len(texts))
 
-        return ner_list
+        with stage_timer("ner", "forward"):
+            bucket_outputs = run_bucketed(self.backend, tokenized_input, self.tokenizer.pad_token_id,
+                                          self.padding_stats)
 
+        with stage_timer("ner", "decode"):
+            return decode_token_labels(bucket_outputs, tokenized_input, sample_mapping, texts, self.label_names)
 
-ner_model = NerModel()
@@ -0,0 +1,116 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+from app.core.config import settings
+from app.core.key_phrases import extract_key_phrases
+from app.core.registry import ModelDisabledError, model_registry
+
+executor = ThreadPoolExecutor(max_workers=settings.PIPELINE_WORKERS, thread_name_prefix="pipeline")
+
+ANALYSIS_TASKS = {
+    "sentiment": "sentiment",
+    "pii": "pii_labels",
+    "ner": "ner_labels",
+    "pos": "pos_labels",
+    "key_phrases": "key_phrases",
+}
+
+MODEL_STAGES = {
+    "sentiment": ("sentiment", "predict_sentiment", "predict_sentiment_batch"),
+    "pii_labels": ("pii", "predict_labels", "predict_labels_batch"),
+    "ner_labels": ("ner", "predict_labels", "predict_labels_batch"),
+    "pos_labels": ("pos", "predict_labels", "predict_labels_batch"),
+}
+
+TASK_MODELS = {"sentiment": "sentiment", "pii": "pii", "ner": "ner", "pos": "pos"}
+
+
+def run_model(name: str, method: str, corpus: str):
+    return getattr(model_registry.get(name), method)(corpus)
+
+
+def run_model_batch(name: str, method: str, corpora: List[str]) -> list:
+    return run_batch_stage(getattr(model_registry.get(name), method), corpora)
+
+
+def task_enabled(task: str) -> bool:
+    return task not in TASK_MODELS or model_registry.enabled(TASK_MODELS[task])
+
+
+def resolve_tasks(tasks: List[str] | None) -> List[str] | None:
+    if tasks is None:
+        enabled = [task for task in ANALYSIS_TASKS if task_enabled(task)]
+        return None if len(enabled) == len(ANALYSIS_TASKS) else enabled
+
+    for task in tasks:
+        if not task_enabled(task):
+            raise ModelDisabledError(TASK_MODELS[task])
+
+    return tasks
+
+
+def selected_stages(tasks: List[str] | None) -> List[str]:
+    return list(ANALYSIS_TASKS.values()) if tasks is None else [ANALYSIS_TASKS[task] for task in tasks]
+
+
+def run_analysis(corpus: str, tasks: List[str] | None = None) -> dict:
+    stages = selected_stages(tasks)
+    futures = {
+        stage: executor.submit(run_model, name, method, corpus)
+        for stage, (name, method, _) in MODEL_STAGES.items() if stage in stages
+    }
+    if "key_phrases" in stages:
+        futures["key_phrases"] = executor.submit(extract_key_phrases, corpus)
+
+    return {stage: future.result() for stage, future in futures.items()}
+
+
+def run_batch_stage(batch_fn: Callable[[List[str]], list], corpora: List[str]) -> list:
+    results = []
+
+    for start in range(0, len(corpora), settings.BATCH_MAX_SIZE):
+        chunk = corpora[start:start + settings.BATCH_MAX_SIZE]
+        try:
+            results.extend(batch_fn(chunk))
+        except Exception:
+            results.extend(run_isolated(batch_fn, corpus) for corpus in chunk)
+
+    return results
+
+
+def run_isolated(batch_fn: Callable[[List[str]], list], corpus: str):
+    try:
+        return batch_fn([corpus])[0]
+    except Exception as exc:
+        return exc
+
+
+def extract_key_phrases_batch(corpora: List[str]) -> list:
+    results = []
+
+    for corpus in corpora:
+        try:
+            results.append(extract_key_phrases(corpus))
+        except Exception as exc:
+            results.append(exc)
+
+    return results
+
+
+def run_batch_analysis(corpora: List[str], tasks: List[str] | None = None) -> List[dict | Exception]:
+    stages = selected_stages(tasks)
+    futures = {
+        stage: executor.submit(run_model_batch, name, batch_method, corpora)
+        for stage, (name, _, batch_method) in MODEL_STAGES.items() if stage in stages
+    }
+    if "key_phrases" in stages:
+        futures["key_phrases"] = executor.submit(extract_key_phrases_batch, corpora)
+    stages = {stage: future.result() for stage, future in futures.items()}
+
+    results = []
+    for index in range(len(corpora)):
+        result = {stage: outputs[index] for stage, outputs in stages.items()}
+        errors = [output for output in result.values() if isinstance(output, Exception)]
+        results.append(errors[0] if errors else result)
+
+    return results
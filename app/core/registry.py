@@ -0,0 +1,93 @@
+import threading
+from typing import Any, Callable, Dict
+
+from app.core.config import settings
+
+WARMUP_TEXT = "John Smith from London wrote a short warmup sentence."
+
+
+class ModelDisabledError(Exception):
+    def __init__(self, name: str):
+        super().__init__(f"The {name} model is disabled in this deployment")
+        self.name = name
+
+
+def load_sentiment_model():
+    from app.core.sentiment import SentimentModel
+
+    return SentimentModel()
+
+
+def load_pii_model():
+    from app.core.pii import PIIModel
+
+    return PIIModel()
+
+
+def load_ner_model():
+    from app.core.ner import NerModel
+
+    return NerModel()
+
+
+def load_pos_model():
+    from app.core.pos import POSModel
+
+    return POSModel()
+
+
+def model_memory_bytes(model: Any) -> int:
+    return model.backend.memory_bytes()
+
+
+class ModelRegistry:
+    def __init__(self, loaders: Dict[str, Callable[[], Any]]):
+        self.loaders = loaders
+        self.models: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+
+    def enabled(self, name: str) -> bool:
+        return getattr(settings, f"{name.upper()}_ENABLED")
+
+    def get(self, name: str) -> Any:
+        if not self.enabled(name):
+            raise ModelDisabledError(name)
+
+        if name not in self.models:
+            with self.lock:
+                if name not in self.models:
+                    self.models[name] = self.loaders[name]()
+
+        return self.models[name]
+
+    def loaded(self) -> Dict[str, Any]:
+        return dict(self.models)
+
+    def warmup(self):
+        for name in self.loaders:
+            if self.enabled(name):
+                self.get(name).warmup(WARMUP_TEXT)
+
+    def ready(self) -> bool:
+        if not settings.WARMUP_MODELS:
+            return True
+
+        return all(name in self.models for name in self.loaders if self.enabled(name))
+
+    def status(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "enabled": self.enabled(name),
+                "loaded": name in self.models,
+                "memory_bytes": model_memory_bytes(self.models[name]) if name in self.models else 0,
+            }
+            for name in self.loaders
+        }
+
+
+model_registry = ModelRegistry({
+    "sentiment": load_sentiment_model,
+    "pii": load_pii_model,
+    "ner": load_ner_model,
+    "pos": load_pos_model,
+})
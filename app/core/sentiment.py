@@ -1,23 +1,37 @@
+from typing import List
+
 import numpy as np
 import torch
 from cleantext import clean
 from sklearn.preprocessing import LabelEncoder
-from transformers import BertTokenizer, BertForSequenceClassification
+from transformers import BertTokenizerFast, BertForSequenceClassification
 
+from app.core.backends import create_backend
+from app.core.batching import MicroBatcher
+from app.core.bucketing import PaddingStats, run_bucketed
 from app.core.config import settings
+from app.core.decoding import merge_bucket_logits, pool_window_logits, window_sample_mapping
+from app.core.telemetry import stage_timer
 
 
 class SentimentModel:
     def __init__(self):
         self.model = BertForSequenceClassification.from_pretrained(
             settings.SENTIMENT_MODEL_PATH)
-        self.tokenizer = BertTokenizer.from_pretrained(
+        self.tokenizer = BertTokenizerFast.from_pretrained(
             settings.SENTIMENT_TOKENIZER_PATH)
         self.label_encoder = LabelEncoder()
+        self.label_encoder.fit(['negative', 'neutral', 'positive'])
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.model.to(self.device)
         self.model.eval()
 
+        self.backend = create_backend(settings.SENTIMENT_BACKEND, self.model, "sentiment", self.device,
+                                      token_level=False)
+        self.model = getattr(self.backend, "model", None)
+        self.padding_stats = PaddingStats("sentiment")
+        self.batcher = MicroBatcher("sentiment", self.predict_sentiment_batch)
+
     def text_cleaner(self, text: str):
         return clean(text,
                      fix_unicode=True,
@@ -39,23 +53,35 @@ class SentimentModel:
         return exp_logits / exp_logits.sum(axis=-1, keepdims=True)
 
     def predict_sentiment(self, sentence: str):
-        self.label_encoder.fit(['negative', 'neutral', 'positive'])
+        return self.batcher.submit(sentence)
+
+    def warmup(self, text: str):
+        self.predict_sentiment_batch([text])
+
+    def predict_sentiment_batch(self, sentences: List[str]):
+        with stage_timer("sentiment", "clean"):
+            cleaned_sentences = [self.text_cleaner(sentence) for sentence in sentences]
 
-        cleaned_sentence = self.text_cleaner(sentence)
-        encoding = self.tokenizer(cleaned_sentence, return_tensors='pt', truncation=True, padding=True)
-        encoding = {k: v.to(self.device) for k, v in encoding.items()}
+        with stage_timer("sentiment", "tokenize"):
+            encoding = self.tokenizer(cleaned_sentences, truncation=True, max_length=settings.WINDOW_MAX_LENGTH,
+                                      stride=settings.WINDOW_OVERLAP, return_overflowing_tokens=settings.SLIDING_WINDOW)
+            sample_mapping = window_sample_mapping(encoding, len(sentences))
 
-        with torch.no_grad():
-            outputs = self.model(**encoding)
+        with stage_timer("sentiment", "forward"):
+            bucket_outputs = run_bucketed(self.backend, encoding, self.tokenizer.pad_token_id, self.padding_stats)
 
-        logits = outputs.logits[0].cpu().tolist()
-        probs = self.softmax(logits)
-        pred_class = np.argmax(probs)
-        pred_label = self.label_encoder.inverse_transform([pred_class])[0]
-        pred_percentage = probs[pred_class]
-        rounded_pred_percentage = round(pred_percentage * 100, 2)
+        with stage_timer("sentiment", "decode"):
+            logits = merge_bucket_logits(bucket_outputs)
+            outputs = pool_window_logits(logits, sample_mapping, len(sentences))
 
-        return pred_label, rounded_pred_percentage
+            predictions = []
+            for logits in outputs.cpu().tolist():
+                probs = self.softmax(logits)
+                pred_class = np.argmax(probs)
+                pred_label = self.label_encoder.inverse_transform([pred_class])[0]
+                pred_percentage = probs[pred_class]
+                rounded_pred_percentage = round(pred_percentage * 100, 2)
+                predictions.append((pred_label, rounded_pred_percentage))
 
+        return predictions
 
-sentiment_model = SentimentModel()
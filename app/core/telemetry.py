@@ -0,0 +1,178 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Tuple
+
+from app.core.config import settings
+
+TRACE_EXPORTERS = ["none", "console", "file", "otlp"]
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def format_labels(label_names: Tuple[str, ...], label_values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.lock = threading.Lock()
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            return [f"{self.name}{format_labels(self.label_names, key)} {value}" for key, value in self.values.items()]
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...],
+                 collect: Callable[[], Dict[Tuple[str, ...], float]]):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.collect = collect
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{format_labels(self.label_names, key)} {value}" for key, value in self.collect().items()]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+
+        with self.lock:
+            entry = self.values.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+            entry[0][bisect.bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+
+        with self.lock:
+            for key, (counts, total) in self.values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    bucket = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{format_labels(self.label_names, key, bucket)} {cumulative}")
+                lines.append(f"{self.name}_sum{format_labels(self.label_names, key)} {total}")
+                lines.append(f"{self.name}_count{format_labels(self.label_names, key)} {cumulative}")
+
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+
+        return metric
+
+    def counter(self, name: str, description: str, label_names: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, description, label_names))
+
+    def gauge(self, name: str, description: str, label_names: Tuple[str, ...],
+              collect: Callable[[], Dict[Tuple[str, ...], float]]) -> Gauge:
+        return self.register(Gauge(name, description, label_names, collect))
+
+    def histogram(self, name: str, description: str, label_names: Tuple[str, ...] = ()) -> Histogram:
+        return self.register(Histogram(name, description, label_names))
+
+    def render(self) -> str:
+        lines = []
+
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+
+        return "\n".join(lines) + "\n"
+
+
+def create_tracer(kind: str):
+    if kind == "none":
+        return None
+    if kind not in TRACE_EXPORTERS:
+        raise ValueError(f"Unknown trace exporter '{kind}', expected one of {TRACE_EXPORTERS}")
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    if kind == "console":
+        exporter = ConsoleSpanExporter()
+    elif kind == "file":
+        exporter = ConsoleSpanExporter(out=open(settings.TRACE_FILE_PATH, "a", encoding="utf-8"),
+                                       formatter=lambda span: span.to_json(indent=None) + "\n")
+    else:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        exporter = OTLPSpanExporter(endpoint=settings.TRACE_OTLP_ENDPOINT)
+
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.PROJECT_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+
+    return provider.get_tracer("app")
+
+
+metrics_registry = MetricsRegistry()
+tracer = create_tracer(settings.TRACE_EXPORTER)
+
+stage_seconds = metrics_registry.histogram(
+    "inference_stage_duration_seconds", "Time spent in each stage of a model call", ("model", "stage"))
+tokens_processed = metrics_registry.counter(
+    "inference_tokens_total", "Tokens sent through the models, real and padded", ("model", "kind"))
+db_query_seconds = metrics_registry.histogram(
+    "db_query_duration_seconds", "Time spent executing database statements", ("operation",))
+db_commit_seconds = metrics_registry.histogram("db_commit_duration_seconds", "Time spent flushing and committing")
+http_request_seconds = metrics_registry.histogram(
+    "http_request_duration_seconds", "Time spent serving HTTP requests", ("method", "route", "status"))
+
+
+def start_span(name: str, **attributes):
+    if tracer is None:
+        return nullcontext()
+
+    return tracer.start_as_current_span(name, attributes=attributes)
+
+
+@contextmanager
+def stage_timer(model: str, stage: str):
+    start = time.perf_counter()
+
+    with start_span(f"{model}.{stage}", model=model, stage=stage):
+        try:
+            yield
+        finally:
+            stage_seconds.observe(time.perf_counter() - start, model=model, stage=stage)
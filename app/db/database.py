@@ -1,10 +1,55 @@
-from sqlalchemy import create_engine
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.core.telemetry import db_commit_seconds, db_query_seconds
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(database_url: str) -> URL:
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}") if backend in ASYNC_DRIVERS else url
+
 
 engine = create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine)
 
+async_engine = create_async_engine(settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
 Base = declarative_base()
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    db_query_seconds.observe(elapsed, operation=statement.lstrip().split(None, 1)[0].upper())
+
+
+def before_commit(session: Session):
+    session.info["commit_started"] = time.perf_counter()
+
+
+def after_commit(session: Session):
+    started = session.info.pop("commit_started", None)
+    if started is not None:
+        db_commit_seconds.observe(time.perf_counter() - started)
+
+
+for instrumented_engine in (engine, async_engine.sync_engine):
+    event.listen(instrumented_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(instrumented_engine, "after_cursor_execute", after_cursor_execute)
+
+event.listen(Session, "before_commit", before_commit)
+event.listen(Session, "after_commit", after_commit)
@@ -0,0 +1,76 @@
+import argparse
+
+from sqlalchemy import delete, insert, literal_column
+
+from app.db.database import SessionLocal
+from app.models.analysis import Sentiment, TokenLabelSet
+from app.repository.analysis import LABEL_MODELS, label_id, pack_labels
+
+INSERTION_ORDER_COLUMNS = {"postgresql": "ctid", "sqlite": "rowid"}
+
+
+def insertion_order(db, model):
+    column = INSERTION_ORDER_COLUMNS.get(db.get_bind().dialect.name)
+
+    return model.id if column is None else literal_column(f"{model.__tablename__}.{column}")
+
+
+def pack_legacy_labels(corpus_id, task: str, labels: list) -> dict:
+    packed = pack_labels(labels)
+    ids = [label["id"] for label in labels]
+    if ids != [label_id(corpus_id, task, index) for index in range(len(labels))]:
+        packed["id"] = [str(id_) for id_ in ids]
+
+    return packed
+
+
+def pack_batch(db, batch_size: int, delete_rows: bool) -> int:
+    sentiments = db.query(Sentiment).filter(~Sentiment.label_sets.any()).limit(batch_size).all()
+    if not sentiments:
+        return 0
+
+    corpus_ids = [sentiment.corpus_id for sentiment in sentiments]
+    label_sets = []
+
+    for task, model in LABEL_MODELS.items():
+        rows = {corpus_id: [] for corpus_id in corpus_ids}
+        labels = db.query(model).filter(model.corpus_id.in_(corpus_ids)) \
+            .order_by(model.corpus_id, model.start, insertion_order(db, model))
+        for label in labels:
+            rows[label.corpus_id].append({"id": label.id, "token": label.token, "label": label.label,
+                                          "prob": label.prob, "start": label.start, "end": label.end})
+
+        label_sets.extend({"corpus_id": corpus_id, "task": task, "labels": pack_legacy_labels(corpus_id, task, labels)}
+                          for corpus_id, labels in rows.items())
+
+        if delete_rows:
+            db.execute(delete(model).where(model.corpus_id.in_(corpus_ids)))
+
+    db.execute(insert(TokenLabelSet.__table__), label_sets)
+    db.commit()
+
+    return len(sentiments)
+
+
+def pack_all(batch_size: int, delete_rows: bool):
+    db = SessionLocal()
+    packed = 0
+
+    try:
+        while True:
+            count = pack_batch(db, batch_size, delete_rows)
+            if not count:
+                break
+            packed += count
+            print(f"packed {packed} analyses")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack per-token label rows into one row per analysis and task")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--delete-rows", action="store_true", help="remove the packed per-token rows")
+    args = parser.parse_args()
+
+    pack_all(args.batch_size, args.delete_rows)
@@ -0,0 +1,44 @@
+import argparse
+
+from sqlalchemy import delete
+
+from app.db.database import SessionLocal
+from app.models.analysis import AnalysisRollup, Sentiment
+from app.repository.analysis import analysis_loader_options, build_sentiment_data
+from app.repository.stats import record_rollups
+
+
+def rebuild_all(batch_size: int):
+    db = SessionLocal()
+    rebuilt = 0
+
+    try:
+        db.execute(delete(AnalysisRollup))
+        query = db.query(Sentiment).options(*analysis_loader_options()).filter(Sentiment.user_id.isnot(None)) \
+            .order_by(Sentiment.corpus_id)
+
+        last_corpus_id = None
+        while True:
+            batch_query = query if last_corpus_id is None else query.filter(Sentiment.corpus_id > last_corpus_id)
+            sentiments = batch_query.limit(batch_size).all()
+            if not sentiments:
+                break
+
+            record_rollups(db, [{**build_sentiment_data(sentiment), "user_id": sentiment.user_id}
+                                for sentiment in sentiments])
+            last_corpus_id = sentiments[-1].corpus_id
+            rebuilt += len(sentiments)
+            db.expunge_all()
+            print(f"rolled up {rebuilt} analyses")
+
+        db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the analysis rollups from stored analyses")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    rebuild_all(args.batch_size)
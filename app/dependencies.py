@@ -1,46 +1,69 @@
+import time
+
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database import SessionLocal
+from app.core.admission import rate_limiter
+from app.core.cache import token_cache, user_cache
+from app.db.database import AsyncSessionLocal
 from app.repository.auth import SECRET_KEY, ALGORITHM
 from app.repository.user import get_user_by_email
-from app.schemas.user import UserBase
+from app.schemas.user import UserBase, User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
     credentials_exception = HTTPException(
         status_code=401,
         detail={"error_message": "Could not validate credentials"},
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
+    email = token_cache.get(token)
 
-        if email is None:
-            raise credentials_exception
+    if email is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            email: str = payload.get("sub")
 
-        token_data = UserBase(email=email)
+            if email is None:
+                raise credentials_exception
 
-    except JWTError:
-        raise credentials_exception
+            token_data = UserBase(email=email)
 
-    user = get_user_by_email(db, email=token_data.email)
+        except JWTError:
+            raise credentials_exception
+
+        email = token_data.email
+        token_cache.put(token, email, ttl_seconds=payload.get("exp", 0) - time.time())
+
+    user = user_cache.get(email)
 
     if user is None:
+        db_user = await db.run_sync(get_user_by_email, email=email)
+        await db.commit()
+
+        if db_user is None:
+            raise credentials_exception
+
+        user = User.from_orm(db_user)
+        user_cache.put(email, user)
+
+    if not user.is_active:
         raise credentials_exception
 
     return user
+
+
+async def get_rate_limited_user(current_user: User = Depends(get_current_user)) -> User:
+    rate_limiter.acquire(current_user.id)
+
+    return current_user
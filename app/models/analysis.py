@@ -1,10 +1,13 @@
 import uuid
+from datetime import datetime
 
-from sqlalchemy import Column, String, Float, ForeignKey
+from sqlalchemy import Column, String, Float, ForeignKey, Integer, JSON, DateTime, Index, DDL, event, func, \
+    literal_column
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
 from app.db.database import Base
+from app.models.user import User
 
 
 class Sentiment(Base):
@@ -13,46 +16,97 @@ class Sentiment(Base):
     corpus = Column(String)
     prob = Column(Float)
     sentiment = Column(String)
+    corpus_hash = Column(String(64), index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey(User.id))
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    tasks = Column(JSON)
     pii_labels = relationship("PII", back_populates="sentiment")
     ner_labels = relationship("NER", back_populates="sentiment")
     pos_labels = relationship("POS", back_populates="sentiment")
     key_phrases = relationship("KeyPhrases", back_populates="sentiment")
+    label_sets = relationship("TokenLabelSet", back_populates="sentiment")
+
+    __table_args__ = (
+        Index("ix_sentiments_user_id_created_at", "user_id", "created_at", "corpus_id"),
+        Index("ix_sentiments_corpus_tsv", func.to_tsvector(literal_column("'english'"), corpus),
+              postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+
+
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE sentiments_fts USING fts5(corpus, content='sentiments', content_rowid='rowid')",
+    "CREATE TRIGGER sentiments_fts_insert AFTER INSERT ON sentiments BEGIN "
+    "INSERT INTO sentiments_fts(rowid, corpus) VALUES (new.rowid, new.corpus); END",
+    "CREATE TRIGGER sentiments_fts_delete AFTER DELETE ON sentiments BEGIN "
+    "INSERT INTO sentiments_fts(sentiments_fts, rowid, corpus) VALUES ('delete', old.rowid, old.corpus); END",
+)
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(Sentiment.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
 
 
 class PII(Base):
     __tablename__ = 'pii_labels'
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, index=True)
-    corpus_id = Column(UUID(as_uuid=True), ForeignKey("sentiments.corpus_id"), nullable=False)
+    corpus_id = Column(UUID(as_uuid=True), ForeignKey("sentiments.corpus_id"), nullable=False, index=True)
     token = Column(String, nullable=False)
     label = Column(String, nullable=False)
     prob = Column(Float, nullable=False)
+    start = Column(Integer)
+    end = Column(Integer)
     sentiment = relationship("Sentiment", back_populates="pii_labels")
 
+    __table_args__ = (Index("ix_pii_labels_label_token", "label", "token"),)
+
 
 class NER(Base):
     __tablename__ = 'ner_labels'
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, index=True)
-    corpus_id = Column(UUID(as_uuid=True), ForeignKey("sentiments.corpus_id"), nullable=False)
+    corpus_id = Column(UUID(as_uuid=True), ForeignKey("sentiments.corpus_id"), nullable=False, index=True)
     token = Column(String, nullable=False)
     label = Column(String, nullable=False)
     prob = Column(Float)
+    start = Column(Integer)
+    end = Column(Integer)
     sentiment = relationship("Sentiment", back_populates="ner_labels")
 
+    __table_args__ = (Index("ix_ner_labels_label_token", "label", "token"),)
+
 
 class POS(Base):
     __tablename__ = 'pos_labels'
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, index=True)
-    corpus_id = Column(UUID(as_uuid=True), ForeignKey("sentiments.corpus_id"), nullable=False)
+    corpus_id = Column(UUID(as_uuid=True), ForeignKey("sentiments.corpus_id"), nullable=False, index=True)
     token = Column(String, nullable=False)
     label = Column(String, nullable=False)
     prob = Column(Float)
+    start = Column(Integer)
+    end = Column(Integer)
     sentiment = relationship("Sentiment", back_populates="pos_labels")
 
 
 class KeyPhrases(Base):
     __tablename__ = 'key_phrases'
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, index=True)
-    corpus_id = Column(UUID(as_uuid=True), ForeignKey("sentiments.corpus_id"), nullable=False)
+    corpus_id = Column(UUID(as_uuid=True), ForeignKey("sentiments.corpus_id"), nullable=False, index=True)
     phrase = Column(String, nullable=False)
     score = Column(Float)
     sentiment = relationship("Sentiment", back_populates="key_phrases")
+
+
+class TokenLabelSet(Base):
+    __tablename__ = 'token_label_sets'
+    corpus_id = Column(UUID(as_uuid=True), ForeignKey("sentiments.corpus_id"), primary_key=True)
+    task = Column(String(8), primary_key=True)
+    labels = Column(JSON, nullable=False)
+    sentiment = relationship("Sentiment", back_populates="label_sets")
+
+
+class AnalysisRollup(Base):
+    __tablename__ = 'analysis_rollups'
+    user_id = Column(UUID(as_uuid=True), ForeignKey(User.id), primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    metric = Column(String(16), primary_key=True)
+    label = Column(String, primary_key=True, default="")
+    token = Column(String, primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,34 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, ForeignKey, JSON, DateTime, Index
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.database import Base
+from app.models.user import User
+
+
+class AnalysisJob(Base):
+    __tablename__ = 'analysis_jobs'
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, unique=True, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey(User.id), nullable=False)
+    status = Column(String(16), nullable=False, default="queued")
+    params = Column(JSON, nullable=False)
+    total = Column(Integer, nullable=False)
+    completed = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(String)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_analysis_jobs_status_created_at", "status", "created_at"),
+        Index("ix_analysis_jobs_user_id_status", "user_id", "status"),
+    )
+
+
+class AnalysisJobResult(Base):
+    __tablename__ = 'analysis_job_results'
+    job_id = Column(UUID(as_uuid=True), ForeignKey(AnalysisJob.id), primary_key=True)
+    chunk_start = Column(Integer, primary_key=True)
+    payload = Column(JSON, nullable=False)
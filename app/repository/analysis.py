@@ -1,195 +1,406 @@
-from typing import List, Type
-from uuid import UUID
+import base64
+import json
+from datetime import datetime
+from typing import Dict, List, Tuple
+from uuid import UUID, uuid4, uuid5
+
+from sqlalchemy import Row, func, insert, literal_column, select, table, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session, selectinload
+
+from app.core.cache import analysis_cache, hash_corpus
+from app.core.config import settings
+from app.core.admission import run_inference
+from app.core.pipeline import resolve_tasks, run_analysis, run_batch_analysis
+from app.core.telemetry import stage_timer
+from app.models.analysis import Sentiment, PII, NER, POS, KeyPhrases, TokenLabelSet
+from app.repository.stats import record_rollups
+from app.schemas.analysis import AnalysisRequest, AnalysisBatchBase, AnalysisPageParams, AnalysisSearchParams
 
-from sqlalchemy.orm import Session
+LABEL_MODELS = {"pii": PII, "ner": NER, "pos": POS}
+ANALYSIS_SECTIONS = {
+    "sentiment": ("sentiment", "prob"),
+    "pii": ("pii_labels",),
+    "ner": ("ner_labels",),
+    "pos": ("pos_labels",),
+    "key_phrases": ("key_phrases",),
+}
+SENTIMENT_COLUMNS = ("corpus_id", "corpus", "corpus_hash", "user_id", "created_at", "sentiment", "prob", "tasks")
+CACHED_FIELDS = ("corpus_id", "corpus", "created_at", "sentiment", "prob", "tasks")
+CACHED_ROW_FIELDS = ("pii_labels", "ner_labels", "pos_labels", "key_phrases")
+
+
+async def handle_analysis(db: AsyncSession, params: AnalysisRequest, user_id: UUID) -> dict:
+    params = params.model_copy(update={"tasks": resolve_tasks(params.tasks)})
+    corpus_hash = hash_corpus(params.corpus)
+    cached_records = await db.run_sync(find_cached_analyses, user_id, [corpus_hash], params.tasks)
+
+    if corpus_hash in cached_records:
+        return select_sections(cached_records[corpus_hash], params.tasks)
+
+    await db.commit()
+    results = await run_inference("analysis", run_analysis, params.corpus, params.tasks)
+    analysis = build_analysis(params.corpus, corpus_hash, user_id, results, params.tasks)
+
+    if params.persist:
+        await db.run_sync(save_analyses, [analysis])
+        analysis_cache.put((user_id, corpus_hash), cache_entry(analysis))
+
+    return select_sections(analysis, params.tasks)
 
-from app.core.key_phrases import extract_key_phrases
-from app.core.ner import ner_model
-from app.core.pii import pii_model
-from app.core.pos import pos_model
-from app.core.sentiment import sentiment_model
-from app.models.analysis import Sentiment, PII, NER, POS, KeyPhrases
-from app.schemas.analysis import AnalysisBase
 
+async def handle_batch_analysis(db: AsyncSession, params: AnalysisBatchBase,
+                                user_id: UUID) -> List[dict | Exception]:
+    params = params.model_copy(update={"tasks": resolve_tasks(params.tasks)})
+    corpus_hashes, cached_records, pending = await db.run_sync(find_batch_analyses, user_id, params)
+    await db.commit()
+    results = dict(zip(pending, await run_inference("batch", run_batch_analysis, list(pending.values()), params.tasks)))
 
-def handle_analysis(db: Session, params: AnalysisBase) -> Sentiment:
-    sentiment_record = create_sentiment(db=db, corpus=params.corpus)
+    return await db.run_sync(store_batch_analyses, user_id, params, corpus_hashes, cached_records, results)
 
-    create_pii(db=db, sentiment=sentiment_record)
-    create_ner(db=db, sentiment=sentiment_record)
-    create_pos(db=db, sentiment=sentiment_record)
-    create_key_phrases(db=db, sentiment=sentiment_record)
 
-    return sentiment_record
+def analyze_batch(db: Session, params: AnalysisBatchBase, user_id: UUID) -> List[dict | Exception]:
+    params = params.model_copy(update={"tasks": resolve_tasks(params.tasks)})
+    corpus_hashes, cached_records, pending = find_batch_analyses(db, user_id, params)
+    results = dict(zip(pending, run_batch_analysis(list(pending.values()), params.tasks)))
 
+    return store_batch_analyses(db, user_id, params, corpus_hashes, cached_records, results)
 
-def create_sentiment(db: Session, corpus: str) -> Sentiment:
-    sentiment, probability = sentiment_model.predict_sentiment(corpus)
 
-    sentiment_record = Sentiment(corpus=corpus, sentiment=str(sentiment), prob=float(probability))
-    db.add(sentiment_record)
-    db.commit()
-    db.refresh(sentiment_record)
+def find_batch_analyses(db: Session, user_id: UUID,
+                        params: AnalysisBatchBase) -> Tuple[List[str], Dict[str, dict], Dict[str, str]]:
+    corpus_hashes = [hash_corpus(corpus) for corpus in params.corpora]
+    cached_records = find_cached_analyses(
+        db, user_id, [corpus_hash for corpus, corpus_hash in zip(params.corpora, corpus_hashes) if corpus.strip()],
+        params.tasks)
 
-    return sentiment_record
+    pending = {}
+    for corpus, corpus_hash in zip(params.corpora, corpus_hashes):
+        if corpus.strip() and corpus_hash not in cached_records:
+            pending.setdefault(corpus_hash, corpus)
 
+    return corpus_hashes, cached_records, pending
 
-def create_pii(db: Session, sentiment: Sentiment) -> None:
-    pii_labels = pii_model.predict_labels(sentiment.corpus)
 
-    for pii in pii_labels:
-        pii_record = PII(
-            corpus_id=sentiment.corpus_id,
-            token=pii["token"],
-            label=pii["label"],
-            prob=pii["prob"]
-        )
-        db.add(pii_record)
+def store_batch_analyses(db: Session, user_id: UUID, params: AnalysisBatchBase, corpus_hashes: List[str],
+                         cached_records: Dict[str, dict], results: dict) -> List[dict | Exception]:
+    created_analyses = {}
+    records = []
+    for corpus, corpus_hash in zip(params.corpora, corpus_hashes):
+        if not corpus.strip():
+            records.append(ValueError("Corpus must not be empty"))
+        elif corpus_hash in cached_records:
+            records.append(select_sections(cached_records[corpus_hash], params.tasks))
+        elif isinstance(results[corpus_hash], Exception):
+            records.append(results[corpus_hash])
+        else:
+            if corpus_hash not in created_analyses:
+                created_analyses[corpus_hash] = build_analysis(corpus, corpus_hash, user_id, results[corpus_hash],
+                                                               params.tasks)
+            records.append(select_sections(created_analyses[corpus_hash], params.tasks))
+
+    if params.persist:
+        save_analyses(db, list(created_analyses.values()))
 
-    db.commit()
-    db.refresh(sentiment)
+        for corpus_hash, analysis in created_analyses.items():
+            analysis_cache.put((user_id, corpus_hash), cache_entry(analysis))
 
+    return records
 
-def create_ner(db: Session, sentiment: Sentiment) -> None:
-    ner_labels = ner_model.predict_labels(sentiment.corpus)
 
-    for ner in ner_labels:
-        ner_record = NER(
-            corpus_id=sentiment.corpus_id,
-            token=ner["token"],
-            label=ner["label"],
-            prob=ner["prob"]
-        )
-        db.add(ner_record)
+def batch_item(record: dict | Exception) -> dict:
+    if isinstance(record, Exception):
+        return {"success": False, "data": None, "error": {"message": str(record)}}
 
-    db.commit()
-    db.refresh(sentiment)
+    return {"success": True, "data": record, "error": None}
 
 
-def create_pos(db: Session, sentiment: Sentiment) -> None:
-    pos_labels = pos_model.predict_labels(sentiment.corpus)
+def find_cached_analyses(db: Session, user_id: UUID, corpus_hashes: List[str],
+                         tasks: List[str] | None = None) -> Dict[str, dict]:
+    cached_records = {}
+    pending = set()
 
-    for pos in pos_labels:
-        pos_record = POS(
-            corpus_id=sentiment.corpus_id,
-            token=pos["token"],
-            label=pos["label"],
-            prob=pos["prob"]
-        )
-        db.add(pos_record)
+    for corpus_hash in set(corpus_hashes):
+        entry = analysis_cache.get((user_id, corpus_hash))
+        if entry is None or not covers_tasks(entry["tasks"], tasks):
+            pending.add(corpus_hash)
+        else:
+            analysis_cache.stats.increment("memory_hits")
+            cached_records[corpus_hash] = entry
 
-    db.commit()
-    db.refresh(sentiment)
+    if pending:
+        sentiments = db.query(Sentiment).options(*analysis_loader_options()) \
+            .filter(Sentiment.user_id == user_id, Sentiment.corpus_hash.in_(list(pending))).all()
 
+        for sentiment in sentiments:
+            if sentiment.corpus_hash in cached_records or not covers_tasks(sentiment.tasks, tasks):
+                continue
 
-def create_key_phrases(db: Session, sentiment: Sentiment) -> None:
-    key_phrases = extract_key_phrases(sentiment.corpus)
+            analysis_cache.stats.increment("persistent_hits")
+            cached_records[sentiment.corpus_hash] = cache_entry(build_sentiment_data(sentiment))
+            analysis_cache.put((user_id, sentiment.corpus_hash), cached_records[sentiment.corpus_hash])
 
-    for phrases in key_phrases:
-        key_phrases_record = KeyPhrases(
-            corpus_id=sentiment.corpus_id,
-            score=phrases["score"],
-            phrase=phrases["phrase"]
-        )
-        db.add(key_phrases_record)
+    for corpus_hash in pending:
+        if corpus_hash not in cached_records:
+            analysis_cache.stats.increment("misses")
 
-    db.commit()
-    db.refresh(sentiment)
+    return cached_records
 
 
-def get_analysis_history(db: Session) -> List[Sentiment]:
-    sentiments = db.query(Sentiment).all()
+def covers_tasks(stored_tasks: List[str] | None, tasks: List[str] | None) -> bool:
+    return stored_tasks is None or (tasks is not None and set(tasks) <= set(stored_tasks))
 
-    sentiment_list = [
-        Sentiment(
-            corpus_id=sentiment.corpus_id,
-            corpus=sentiment.corpus
-        ) for sentiment in sentiments
-    ]
 
-    return sentiment_list
+def cache_entry(analysis: dict) -> dict:
+    return {
+        **{key: analysis[key] for key in CACHED_FIELDS},
+        **{key: None if analysis[key] is None else [row_data(row) for row in analysis[key]]
+           for key in CACHED_ROW_FIELDS},
+    }
 
 
-def get_analysis_data(db: Session, corpus_id: UUID) -> Sentiment:
-    sentiment = db.query(Sentiment).filter(Sentiment.corpus_id == corpus_id).first()
+def row_data(row) -> dict:
+    if isinstance(row, dict):
+        return row
 
-    sentiment_data = Sentiment(
-        corpus_id=sentiment.corpus_id,
-        corpus=sentiment.corpus,
-        prob=sentiment.prob,
-        sentiment=sentiment.sentiment,
-        pii_labels=get_pii_labels(sentiment),
-        pos_labels=get_pos_labels(sentiment),
-        ner_labels=get_ner_labels(sentiment),
-        key_phrases=get_key_phrases(sentiment)
+    return {column.key: getattr(row, column.key) for column in row.__table__.columns}
 
-    )
 
-    return sentiment_data
+def build_analysis(corpus: str, corpus_hash: str, user_id: UUID, results: dict,
+                   tasks: List[str] | None = None) -> dict:
+    corpus_id = uuid4()
+    sentiment, probability = results.get("sentiment", (None, None))
 
+    return {
+        "corpus_id": corpus_id,
+        "corpus": corpus,
+        "corpus_hash": corpus_hash,
+        "user_id": user_id,
+        "created_at": datetime.utcnow(),
+        "sentiment": None if sentiment is None else str(sentiment),
+        "prob": None if probability is None else float(probability),
+        "tasks": None if tasks is None else sorted(set(tasks)),
+        "pii_labels": create_label_rows(corpus_id, "pii", results["pii_labels"]) if "pii_labels" in results else None,
+        "ner_labels": create_label_rows(corpus_id, "ner", results["ner_labels"]) if "ner_labels" in results else None,
+        "pos_labels": create_label_rows(corpus_id, "pos", results["pos_labels"]) if "pos_labels" in results else None,
+        "key_phrases": create_key_phrase_rows(corpus_id, results["key_phrases"]) if "key_phrases" in results else None,
+    }
 
-def get_sentiments_list(db: Session) -> List[Sentiment]:
-    sentiments = db.query(Sentiment).all()
 
-    sentiment_list = [
-        Sentiment(
-            corpus_id=sentiment.corpus_id,
-            corpus=sentiment.corpus,
-            prob=sentiment.prob,
-            sentiment=sentiment.sentiment,
-            pii_labels=get_pii_labels(sentiment),
-            pos_labels=get_pos_labels(sentiment),
-            ner_labels=get_ner_labels(sentiment),
-            key_phrases=get_key_phrases(sentiment)
+def select_sections(analysis: dict, tasks: List[str] | None) -> dict:
+    if tasks is None:
+        return analysis
 
-        ) for sentiment in sentiments
-    ]
+    return {**analysis, **{key: None for task, keys in ANALYSIS_SECTIONS.items() if task not in tasks for key in keys}}
 
-    return sentiment_list
 
+def label_id(corpus_id: UUID, task: str, index: int) -> UUID:
+    return uuid5(corpus_id, f"{task}:{index}")
 
-def get_pii_labels(sentiment: Type[Sentiment]) -> List[PII]:
+
+def create_label_rows(corpus_id: UUID, task: str, labels: List[dict]) -> List[dict]:
     return [
-        PII(
-            id=pii.id,
-            corpus_id=pii.corpus_id,
-            token=pii.token,
-            label=pii.label,
-            prob=pii.prob
-        ) for pii in sentiment.pii_labels
+        {
+            "id": label_id(corpus_id, task, index),
+            "corpus_id": corpus_id,
+            "token": label["token"],
+            "label": label["label"],
+            "prob": label["prob"],
+            "start": label["start"],
+            "end": label["end"],
+        } for index, label in enumerate(labels)
     ]
 
 
-def get_ner_labels(sentiment: Type[Sentiment]) -> List[NER]:
-    return [
-        NER(
-            id=ner.id,
-            corpus_id=ner.corpus_id,
-            token=ner.token,
-            label=ner.label,
-            prob=ner.prob
-        ) for ner in sentiment.ner_labels
-    ]
+def pack_labels(labels: List[dict]) -> dict:
+    vocab = sorted({label["label"] for label in labels})
+    label_ids = {label: index for index, label in enumerate(vocab)}
+
+    packed = {
+        "vocab": vocab,
+        "label_ids": [label_ids[label["label"]] for label in labels],
+        "prob": [label["prob"] for label in labels],
+        "start": [label["start"] for label in labels],
+        "end": [label["end"] for label in labels],
+    }
+    if any(label["start"] is None for label in labels):
+        packed["token"] = [label["token"] for label in labels]
+
+    return packed
 
 
-def get_pos_labels(sentiment: Type[Sentiment]) -> List[POS]:
+def unpack_labels(corpus_id: UUID, corpus: str, task: str, packed: dict) -> List[dict]:
+    tokens = packed.get("token") or [corpus[start:end] for start, end in zip(packed["start"], packed["end"])]
+    ids = packed.get("id")
+
     return [
-        POS(
-            id=pos.id,
-            corpus_id=pos.corpus_id,
-            token=pos.token,
-            label=pos.label,
-            prob=pos.prob
-        ) for pos in sentiment.pos_labels
+        {
+            "id": label_id(corpus_id, task, index) if ids is None else UUID(ids[index]),
+            "corpus_id": corpus_id,
+            "token": token,
+            "label": packed["vocab"][label_index],
+            "prob": prob,
+            "start": start,
+            "end": end,
+        } for index, (token, label_index, prob, start, end) in
+        enumerate(zip(tokens, packed["label_ids"], packed["prob"], packed["start"], packed["end"]))
     ]
 
 
-def get_key_phrases(sentiment: Type[Sentiment]) -> List[KeyPhrases]:
+def create_key_phrase_rows(corpus_id: UUID, key_phrases: List[dict]) -> List[dict]:
     return [
-        KeyPhrases(
-            id=key_phrases.id,
-            corpus_id=key_phrases.corpus_id,
-            score=key_phrases.score,
-            phrase=key_phrases.phrase
-        ) for key_phrases in sentiment.key_phrases
+        {"id": uuid4(), "corpus_id": corpus_id, "score": phrases["score"], "phrase": phrases["phrase"]}
+        for phrases in key_phrases
     ]
+
+
+def save_analyses(db: Session, analyses: List[dict]) -> None:
+    if not analyses:
+        return
+
+    with stage_timer("db", "insert"):
+        db.execute(insert(Sentiment.__table__), [
+            {column: analysis[column] for column in SENTIMENT_COLUMNS} for analysis in analyses
+        ])
+
+        if settings.LABEL_STORAGE == "packed":
+            db.execute(insert(TokenLabelSet.__table__), [
+                {"corpus_id": analysis["corpus_id"], "task": task, "labels": pack_labels(analysis[f"{task}_labels"])}
+                for analysis in analyses for task in LABEL_MODELS if analysis[f"{task}_labels"] is not None
+            ])
+            row_tables = ((KeyPhrases, "key_phrases"),)
+        else:
+            row_tables = tuple((model, f"{task}_labels") for task, model in LABEL_MODELS.items()) + \
+                ((KeyPhrases, "key_phrases"),)
+
+        for model, key in row_tables:
+            rows = [row for analysis in analyses for row in analysis[key] or []]
+            if rows:
+                db.execute(insert(model.__table__), rows)
+
+    with stage_timer("db", "rollups"):
+        record_rollups(db, analyses)
+
+    with stage_timer("db", "commit"):
+        db.commit()
+
+
+def get_analysis_history(db: Session, user_id: UUID, params: AnalysisPageParams) -> Tuple[List[Row], str | None]:
+    query = db.query(Sentiment.corpus_id, Sentiment.corpus, Sentiment.created_at).filter(Sentiment.user_id == user_id)
+
+    return paginate_analyses(query, params)
+
+
+def search_analyses(db: Session, user_id: UUID, params: AnalysisSearchParams) -> Tuple[List[Row], str | None]:
+    if not (params.q and params.q.strip()) and params.label is None and params.token is None:
+        raise ValueError("Provide a text query or an entity label or token to search for")
+
+    query = db.query(Sentiment.corpus_id, Sentiment.corpus, Sentiment.created_at).filter(Sentiment.user_id == user_id)
+
+    if params.q and params.q.strip():
+        query = query.filter(corpus_match(db, params.q))
+
+    if params.label is not None or params.token is not None:
+        if settings.LABEL_STORAGE == "packed":
+            raise ValueError("Searching by entity label or token is not supported when labels are stored packed")
+
+        model = LABEL_MODELS[params.task]
+        entities = select(model.corpus_id)
+        if params.label is not None:
+            entities = entities.where(model.label == params.label)
+        if params.token is not None:
+            entities = entities.where(model.token == params.token)
+        query = query.filter(Sentiment.corpus_id.in_(entities))
+
+    return paginate_analyses(query, params)
+
+
+def corpus_match(db: Session, text: str):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.to_tsvector(literal_column("'english'"), Sentiment.corpus) \
+            .op("@@")(func.plainto_tsquery(literal_column("'english'"), text))
+
+    terms = " ".join('"{}"'.format(term.replace('"', '""')) for term in text.split())
+    matches = select(literal_column("rowid")).select_from(table("sentiments_fts")) \
+        .where(literal_column("sentiments_fts").op("MATCH")(terms))
+
+    return literal_column("sentiments.rowid").in_(matches)
+
+
+def get_analysis_data(db: Session, user_id: UUID, corpus_id: UUID) -> dict | None:
+    sentiment = db.query(Sentiment).options(*analysis_loader_options()) \
+        .filter(Sentiment.user_id == user_id, Sentiment.corpus_id == corpus_id).first()
+
+    return None if sentiment is None else build_sentiment_data(sentiment)
+
+
+def get_sentiments_list(db: Session, user_id: UUID, params: AnalysisPageParams) -> Tuple[List[dict], str | None]:
+    query = db.query(Sentiment).options(*analysis_loader_options()).filter(Sentiment.user_id == user_id)
+    sentiments, next_cursor = paginate_analyses(query, params)
+
+    return [build_sentiment_data(sentiment) for sentiment in sentiments], next_cursor
+
+
+def paginate_analyses(query: Query, params: AnalysisPageParams) -> Tuple[list, str | None]:
+    if params.sentiment is not None:
+        query = query.filter(Sentiment.sentiment == params.sentiment)
+    if params.created_after is not None:
+        query = query.filter(Sentiment.created_at >= params.created_after)
+    if params.created_before is not None:
+        query = query.filter(Sentiment.created_at < params.created_before)
+    if params.cursor is not None:
+        query = query.filter(tuple_(Sentiment.created_at, Sentiment.corpus_id) < decode_cursor(params.cursor))
+
+    rows = query.order_by(Sentiment.created_at.desc(), Sentiment.corpus_id.desc()).limit(params.limit + 1).all()
+    next_cursor = encode_cursor(rows[params.limit - 1]) if len(rows) > params.limit else None
+
+    return rows[:params.limit], next_cursor
+
+
+def encode_cursor(row) -> str:
+    position = json.dumps([row.created_at.isoformat(), str(row.corpus_id)])
+
+    return base64.urlsafe_b64encode(position.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        created_at, corpus_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), UUID(corpus_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid pagination cursor") from exc
+
+
+def analysis_loader_options() -> list:
+    return [selectinload(relationship) for relationship in (Sentiment.pii_labels, Sentiment.ner_labels,
+                                                            Sentiment.pos_labels, Sentiment.key_phrases,
+                                                            Sentiment.label_sets)]
+
+
+def build_sentiment_data(sentiment: Sentiment) -> dict:
+    analysis = {
+        "corpus_id": sentiment.corpus_id,
+        "corpus": sentiment.corpus,
+        "created_at": sentiment.created_at,
+        "prob": sentiment.prob,
+        "sentiment": sentiment.sentiment,
+        "tasks": sentiment.tasks,
+        "pii_labels": get_token_labels(sentiment, "pii"),
+        "ner_labels": get_token_labels(sentiment, "ner"),
+        "pos_labels": get_token_labels(sentiment, "pos"),
+        "key_phrases": sentiment.key_phrases,
+    }
+
+    return select_sections(analysis, sentiment.tasks)
+
+
+def get_token_labels(sentiment: Sentiment, task: str) -> List[PII | NER | POS | dict]:
+    labels = getattr(sentiment, f"{task}_labels")
+    if labels:
+        return labels
+
+    for label_set in sentiment.label_sets:
+        if label_set.task == task:
+            return unpack_labels(sentiment.corpus_id, sentiment.corpus, task, label_set.labels)
+
+    return []
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.job import AnalysisJob, AnalysisJobResult
+from app.schemas.analysis import AnalysisBatchBase
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def create_job(db: Session, user_id: UUID, params: AnalysisBatchBase) -> AnalysisJob:
+    job = AnalysisJob(user_id=user_id, params=params.model_dump(), total=len(params.corpora), completed=0)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    return job
+
+
+def get_job(db: Session, user_id: UUID, job_id: UUID) -> Optional[AnalysisJob]:
+    return db.query(AnalysisJob).filter(AnalysisJob.id == job_id, AnalysisJob.user_id == user_id).first()
+
+
+def count_active_jobs(db: Session, user_id: UUID) -> int:
+    return db.query(func.count(AnalysisJob.id)) \
+        .filter(AnalysisJob.user_id == user_id, AnalysisJob.status.in_(ACTIVE_STATUSES)).scalar()
+
+
+def claim_job(db: Session, job_id: UUID | None = None) -> Optional[AnalysisJob]:
+    stale_before = datetime.utcnow() - timedelta(seconds=settings.JOB_TIMEOUT_SECONDS)
+    claimable = or_(AnalysisJob.status == "queued",
+                    and_(AnalysisJob.status == "running", AnalysisJob.updated_at < stale_before))
+
+    query = db.query(AnalysisJob).filter(claimable)
+    if job_id is not None:
+        query = query.filter(AnalysisJob.id == job_id)
+
+    for job in query.order_by(AnalysisJob.created_at).limit(settings.JOB_WORKERS + 1).all():
+        if job.attempts >= settings.JOB_MAX_ATTEMPTS:
+            fail_job(db, job, "Job exceeded its maximum number of attempts")
+            continue
+
+        claimed = db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.id == job.id, AnalysisJob.status == job.status, AnalysisJob.updated_at == job.updated_at)
+            .values(status="running", attempts=AnalysisJob.attempts + 1, updated_at=datetime.utcnow())
+        ).rowcount
+        db.commit()
+
+        if claimed:
+            db.refresh(job)
+            return job
+
+    return None
+
+
+def get_job_results(db: Session, job_id: UUID) -> List[dict]:
+    chunks = db.query(AnalysisJobResult.payload).filter(AnalysisJobResult.job_id == job_id) \
+        .order_by(AnalysisJobResult.chunk_start).all()
+
+    return [result for payload, in chunks for result in payload]
+
+
+def save_job_progress(db: Session, job: AnalysisJob, results: List[dict]) -> None:
+    db.add(AnalysisJobResult(job_id=job.id, chunk_start=job.completed, payload=results))
+    job.completed += len(results)
+    job.updated_at = datetime.utcnow()
+    db.commit()
+
+
+def complete_job(db: Session, job: AnalysisJob) -> None:
+    job.status = "succeeded"
+    job.error = None
+    job.updated_at = datetime.utcnow()
+    db.commit()
+
+
+def fail_job(db: Session, job: AnalysisJob, error: str) -> None:
+    job.status = "failed"
+    job.error = error
+    job.updated_at = datetime.utcnow()
+    db.commit()
+
+
+def retry_or_fail_job(db: Session, job: AnalysisJob, error: str) -> None:
+    if job.attempts >= settings.JOB_MAX_ATTEMPTS:
+        fail_job(db, job, error)
+        return
+
+    job.status = "queued"
+    job.error = error
+    job.updated_at = datetime.utcnow()
+    db.commit()
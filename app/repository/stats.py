@@ -0,0 +1,159 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Query, Session
+
+from app.models.analysis import AnalysisRollup
+from app.schemas.analysis import AnalysisStatsParams
+
+ROLLUP_KEYS = ("user_id", "bucket", "metric", "label", "token")
+SERIES_METRICS = ("analyses", "sentiment", "pii_any", "pii_checked")
+
+
+def hour_bucket(created_at: datetime) -> datetime:
+    return created_at.replace(minute=0, second=0, microsecond=0)
+
+
+def truncate_bucket(bucket: datetime, granularity: str) -> datetime:
+    if granularity == "day":
+        return bucket.replace(hour=0)
+    if granularity == "week":
+        return bucket.replace(hour=0) - timedelta(days=bucket.weekday())
+    if granularity == "month":
+        return bucket.replace(day=1, hour=0)
+
+    return bucket
+
+
+def entity_type(label: str) -> str:
+    return label[2:] if label[:2] in ("B-", "I-") else label
+
+
+def label_value(label, key: str):
+    return label[key] if isinstance(label, dict) else getattr(label, key)
+
+
+def ner_entities(corpus: str, labels: Iterable) -> List[Tuple[str, str]]:
+    entities = []
+    current = None
+
+    for label in labels:
+        name, start, end = label_value(label, "label"), label_value(label, "start"), label_value(label, "end")
+        if name == "O":
+            current = None
+            continue
+
+        kind = entity_type(name)
+        if current is not None and name.startswith("I-") and current[0] == kind and start is not None:
+            current[2] = end
+        else:
+            current = [kind, start, end, label_value(label, "token")]
+            entities.append(current)
+
+    return [(kind, (corpus[start:end] if start is not None else token).lower())
+            for kind, start, end, token in entities]
+
+
+def analysis_rollup_counts(analysis: dict) -> Counter:
+    counts = Counter()
+    if analysis["user_id"] is None:
+        return counts
+
+    key = (analysis["user_id"], hour_bucket(analysis["created_at"]))
+    counts[key + ("analyses", "", "")] += 1
+
+    if analysis["sentiment"] is not None:
+        counts[key + ("sentiment", analysis["sentiment"], "")] += 1
+
+    for kind, token in ner_entities(analysis["corpus"], analysis["ner_labels"] or []):
+        counts[key + ("entity", kind, token)] += 1
+
+    if analysis["pii_labels"] is None:
+        return counts
+
+    counts[key + ("pii_checked", "", "")] += 1
+    pii_types = {entity_type(label_value(label, "label")) for label in analysis["pii_labels"]} - {"O"}
+    if pii_types:
+        counts[key + ("pii_any", "", "")] += 1
+    for kind in pii_types:
+        counts[key + ("pii", kind, "")] += 1
+
+    return counts
+
+
+def record_rollups(db: Session, analyses: List[dict]) -> None:
+    counts = sum((analysis_rollup_counts(analysis) for analysis in analyses), Counter())
+    if not counts:
+        return
+
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    statement = dialect_insert(AnalysisRollup.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(ROLLUP_KEYS),
+        set_={"count": AnalysisRollup.__table__.c.count + statement.excluded.count},
+    )
+
+    db.execute(statement, [{**dict(zip(ROLLUP_KEYS, key)), "count": count} for key, count in counts.items()])
+
+
+def filter_rollups(query: Query, user_id: UUID, params: AnalysisStatsParams) -> Query:
+    query = query.filter(AnalysisRollup.user_id == user_id)
+    if params.created_after is not None:
+        query = query.filter(AnalysisRollup.bucket >= params.created_after)
+    if params.created_before is not None:
+        query = query.filter(AnalysisRollup.bucket < params.created_before)
+
+    return query
+
+
+def get_analysis_stats(db: Session, user_id: UUID, params: AnalysisStatsParams) -> dict:
+    for bound in (params.created_after, params.created_before):
+        if bound is not None and bound != hour_bucket(bound):
+            raise ValueError("created_after and created_before must fall on the hour, stats are stored hourly")
+
+    total = func.sum(AnalysisRollup.count)
+
+    series_rows = filter_rollups(
+        db.query(AnalysisRollup.bucket, AnalysisRollup.metric, AnalysisRollup.label, total), user_id, params
+    ).filter(AnalysisRollup.metric.in_(SERIES_METRICS)) \
+        .group_by(AnalysisRollup.bucket, AnalysisRollup.metric, AnalysisRollup.label).all()
+
+    entity_rows = filter_rollups(db.query(AnalysisRollup.label, AnalysisRollup.token, total), user_id, params) \
+        .filter(AnalysisRollup.metric == "entity") \
+        .group_by(AnalysisRollup.label, AnalysisRollup.token) \
+        .order_by(total.desc()).limit(params.top).all()
+
+    pii_rows = filter_rollups(db.query(AnalysisRollup.label, total), user_id, params) \
+        .filter(AnalysisRollup.metric == "pii").group_by(AnalysisRollup.label).all()
+
+    buckets = {}
+    for bucket, metric, label, count in series_rows:
+        entry = buckets.setdefault(truncate_bucket(bucket, params.bucket),
+                                   {"analyses": 0, "pii_checked": 0, "pii_analyses": 0, "sentiments": Counter()})
+        if metric in ("analyses", "pii_checked"):
+            entry[metric] += count
+        elif metric == "pii_any":
+            entry["pii_analyses"] += count
+        else:
+            entry["sentiments"][label] += count
+
+    analyses = sum(entry["analyses"] for entry in buckets.values())
+    pii_checked = sum(entry["pii_checked"] for entry in buckets.values())
+    pii_analyses = sum(entry["pii_analyses"] for entry in buckets.values())
+
+    return {
+        "analyses": analyses,
+        "sentiments": dict(sum((entry["sentiments"] for entry in buckets.values()), Counter())),
+        "pii_hit_rate": round(pii_analyses / pii_checked, 4) if pii_checked else None,
+        "pii_labels": {label: round(count / pii_checked, 4) if pii_checked else 0.0 for label, count in pii_rows},
+        "top_entities": [{"label": label, "token": token, "count": count} for label, token, count in entity_rows],
+        "buckets": [
+            {"bucket": bucket, "analyses": entry["analyses"], "pii_analyses": entry["pii_analyses"],
+             "sentiments": dict(entry["sentiments"])}
+            for bucket, entry in sorted(buckets.items())
+        ],
+    }
@@ -3,7 +3,7 @@ from uuid import UUID
 
 from sqlalchemy.orm import Session
 
-from app.core.security import get_password_hash
+from app.core.cache import user_cache
 from app.models.user import User
 from app.schemas.user import UserCreate
 
@@ -20,13 +20,27 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
 
-def create_user(db: Session, user: UserCreate) -> User:
+def create_user(db: Session, user: UserCreate, hashed_password: str) -> User:
     db_user = User(
         email=user.email,
-        hashed_password=get_password_hash(user.password)
+        hashed_password=hashed_password
     )
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
 
     return db_user
+
+
+def deactivate_user(db: Session, user_id: UUID) -> Optional[User]:
+    db_user = get_user_by_id(db, user_id=user_id)
+
+    if db_user is None:
+        return None
+
+    db_user.is_active = False
+    db.commit()
+    db.refresh(db_user)
+    user_cache.discard(db_user.email)
+
+    return db_user
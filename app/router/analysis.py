@@ -1,66 +1,138 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-
-from app.core.ner import ner_model
-from app.core.pii import pii_model
-from app.core.pos import pos_model
-from app.dependencies import get_current_user, get_db
-from app.repository.analysis import handle_analysis, get_sentiments_list, get_analysis_history, get_analysis_data
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import analysis_cache
+from app.core.admission import inference_lanes, run_inference
+from app.core.registry import model_registry, ModelDisabledError
+from app.dependencies import get_current_user, get_db, get_rate_limited_user
+from app.repository.analysis import handle_analysis, get_sentiments_list, get_analysis_history, get_analysis_data, \
+    handle_batch_analysis, search_analyses, batch_item
+from app.repository.stats import get_analysis_stats
 from app.schemas.analysis import AnalysisResponse, AnalysisBase, PIIResponse, NERResponse, POSResponse, \
-    AnalysisResponseList, AnalysisHistoryResponse, AnalysisInfoResponse, AnalysisInfoParams
+    AnalysisResponseList, AnalysisHistoryResponse, AnalysisInfoResponse, AnalysisInfoParams, BatchingStatsResponse, \
+    AnalysisBatchBase, AnalysisBatchResponse, CacheStatsResponse, AnalysisPageParams, AnalysisStatsParams, \
+    AnalysisStatsResponse, AnalysisSearchParams, AnalysisRequest, AdmissionStatsResponse
 from app.schemas.user import User
 
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
 
+def get_model(name: str):
+    try:
+        return model_registry.get(name)
+    except ModelDisabledError as exc:
+        raise HTTPException(status_code=503, detail={"error_message": str(exc)})
+
+
+def predict_token_labels(name: str, corpus: str) -> list:
+    return get_model(name).predict_labels(corpus)
+
+
 @router.post("/sentiment", response_model=AnalysisResponse)
-def create_analysis(data: AnalysisBase, current_user: User = Depends(get_current_user),
-                    db: Session = Depends(get_db)):
-    sentiment_data = handle_analysis(db=db, params=data)
+async def create_analysis(data: AnalysisRequest, current_user: User = Depends(get_rate_limited_user),
+                          db: AsyncSession = Depends(get_db)):
+    sentiment_data = await handle_analysis(db=db, params=data, user_id=current_user.id)
 
     return {"success": True, "data": sentiment_data, "error": None}
 
 
+@router.post("/batch", response_model=AnalysisBatchResponse)
+async def create_batch_analysis(data: AnalysisBatchBase, current_user: User = Depends(get_rate_limited_user),
+                                db: AsyncSession = Depends(get_db)):
+    records = await handle_batch_analysis(db=db, params=data, user_id=current_user.id)
+
+    return {"success": True, "data": [batch_item(record) for record in records], "error": None}
+
+
 @router.get("/sentiments-list", response_model=AnalysisResponseList)
-def get_sentiment_analysis(current_user: User = Depends(get_current_user),
-                           db: Session = Depends(get_db)):
-    sentiment_list = get_sentiments_list(db=db)
+async def get_sentiment_analysis(params: AnalysisPageParams = Depends(),
+                                 current_user: User = Depends(get_current_user),
+                                 db: AsyncSession = Depends(get_db)):
+    try:
+        sentiment_list, next_cursor = await db.run_sync(get_sentiments_list, user_id=current_user.id, params=params)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail={"error_message": str(exc)})
 
-    return {"success": True, "data": sentiment_list, "error": None}
+    return {"success": True, "data": sentiment_list, "next_cursor": next_cursor, "error": None}
 
 
 @router.get("/history", response_model=AnalysisHistoryResponse)
-def get_history(current_user: User = Depends(get_current_user),
-                db: Session = Depends(get_db)):
-    history = get_analysis_history(db=db)
+async def get_history(params: AnalysisPageParams = Depends(), current_user: User = Depends(get_current_user),
+                      db: AsyncSession = Depends(get_db)):
+    try:
+        history, next_cursor = await db.run_sync(get_analysis_history, user_id=current_user.id, params=params)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail={"error_message": str(exc)})
+
+    return {"success": True, "data": history, "next_cursor": next_cursor, "error": None}
+
+
+@router.get("/search", response_model=AnalysisHistoryResponse)
+async def search(params: AnalysisSearchParams = Depends(), current_user: User = Depends(get_current_user),
+                 db: AsyncSession = Depends(get_db)):
+    try:
+        results, next_cursor = await db.run_sync(search_analyses, user_id=current_user.id, params=params)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail={"error_message": str(exc)})
+
+    return {"success": True, "data": results, "next_cursor": next_cursor, "error": None}
 
-    return {"success": True, "data": history, "error": None}
+
+@router.get("/stats", response_model=AnalysisStatsResponse)
+async def get_stats(params: AnalysisStatsParams = Depends(), current_user: User = Depends(get_current_user),
+                    db: AsyncSession = Depends(get_db)):
+    try:
+        stats = await db.run_sync(get_analysis_stats, user_id=current_user.id, params=params)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail={"error_message": str(exc)})
+
+    return {"success": True, "data": stats, "error": None}
 
 
 @router.post("/analysis-info", response_model=AnalysisInfoResponse)
-def get_analysis_info(params: AnalysisInfoParams, current_user: User = Depends(get_current_user),
-                      db: Session = Depends(get_db)):
-    analysis_info = get_analysis_data(db=db, corpus_id=params.corpus_id)
+async def get_analysis_info(params: AnalysisInfoParams, current_user: User = Depends(get_current_user),
+                            db: AsyncSession = Depends(get_db)):
+    analysis_info = await db.run_sync(get_analysis_data, user_id=current_user.id, corpus_id=params.corpus_id)
 
     return {"success": True, "data": analysis_info, "error": None}
 
 
 @router.post("/pii", response_model=PIIResponse)
-def pii_analysis(data: AnalysisBase, current_user: User = Depends(get_current_user)):
-    labels = pii_model.predict_labels(data.corpus)
+async def pii_analysis(data: AnalysisBase, current_user: User = Depends(get_rate_limited_user)):
+    labels = await run_inference("labels", predict_token_labels, "pii", data.corpus)
 
     return {"corpus": data.corpus, "labels": labels}
 
 
 @router.post("/ner", response_model=NERResponse)
-def ner_analysis(data: AnalysisBase, current_user: User = Depends(get_current_user)):
-    labels = ner_model.predict_labels(data.corpus)
+async def ner_analysis(data: AnalysisBase, current_user: User = Depends(get_rate_limited_user)):
+    labels = await run_inference("labels", predict_token_labels, "ner", data.corpus)
 
     return {"corpus": data.corpus, "labels": labels}
 
 
 @router.post("/pos", response_model=POSResponse)
-def ner_analysis(data: AnalysisBase, current_user: User = Depends(get_current_user)):
-    labels = pos_model.predict_labels(data.corpus)
+async def ner_analysis(data: AnalysisBase, current_user: User = Depends(get_rate_limited_user)):
+    labels = await run_inference("labels", predict_token_labels, "pos", data.corpus)
 
     return {"corpus": data.corpus, "labels": labels}
+
+
+@router.get("/batching-stats", response_model=BatchingStatsResponse)
+async def get_batching_stats(current_user: User = Depends(get_current_user)):
+    stats = {name: {**model.batcher.stats.snapshot(), **model.padding_stats.snapshot()}
+             for name, model in model_registry.loaded().items()}
+
+    return {"success": True, "data": stats, "error": None}
+
+
+@router.get("/cache-stats", response_model=CacheStatsResponse)
+async def get_cache_stats(current_user: User = Depends(get_current_user)):
+    return {"success": True, "data": analysis_cache.snapshot(), "error": None}
+
+
+@router.get("/admission-stats", response_model=AdmissionStatsResponse)
+async def get_admission_stats(current_user: User = Depends(get_current_user)):
+    stats = {name: lane.snapshot() for name, lane in inference_lanes.items()}
+
+    return {"success": True, "data": stats, "error": None}
@@ -1,23 +1,26 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import verify_password
-from app.dependencies import get_db
+from app.core.cache import token_cache, user_cache
+from app.core.security import get_password_hash, verify_password
+from app.dependencies import get_current_user, get_db
 from app.repository.auth import create_access_token
 from app.repository.user import create_user, get_user_by_email
-from app.schemas.user import UserCreate, AuthResponse, User
+from app.schemas.user import UserCreate, AuthResponse, User, AuthCacheStatsResponse
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=AuthResponse)
-def create_new_user(user: UserCreate, db: Session = Depends(get_db)):
-    is_user_exist = get_user_by_email(db, email=user.email)
+async def create_new_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    is_user_exist = await db.run_sync(get_user_by_email, email=user.email)
 
     if is_user_exist:
         return {"success": False, "data": None, "error": {"message": "Email already registered"}}
 
-    new_user = create_user(db, user=user)
+    hashed_password = await run_in_threadpool(get_password_hash, user.password)
+    new_user = await db.run_sync(create_user, user=user, hashed_password=hashed_password)
     access_token = create_access_token(data={"sub": new_user.email})
     user_data = User.from_orm(new_user)
 
@@ -31,14 +34,14 @@ def create_new_user(user: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=AuthResponse)
-def login(user: UserCreate, db: Session = Depends(get_db)):
-    is_user_exist = get_user_by_email(db, email=user.email)
+async def login(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    is_user_exist = await db.run_sync(get_user_by_email, email=user.email)
 
     if not is_user_exist:
         return {"success": False, "data": None, "error": {"message": "User does not exist, please sign up first"}}
         # raise HTTPException(status_code=401, detail={"error_message": "User does not exist, please sign up first"})
 
-    is_password_correct = verify_password(user.password, is_user_exist.hashed_password)
+    is_password_correct = await run_in_threadpool(verify_password, user.password, is_user_exist.hashed_password)
 
     if not is_password_correct:
         return {"success": False, "data": None, "error": {"message": "Incorrect username or password"}}
@@ -54,3 +57,10 @@ def login(user: UserCreate, db: Session = Depends(get_db)):
     }
 
     return {"success": True, "data": data, "error": None}
+
+
+@router.get("/cache-stats", response_model=AuthCacheStatsResponse)
+async def get_auth_cache_stats(current_user: User = Depends(get_current_user)):
+    stats = {"tokens": token_cache.snapshot(), "users": user_cache.snapshot()}
+
+    return {"success": True, "data": stats, "error": None}
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Response
+
+from app.core.registry import model_registry
+from app.schemas.health import HealthResponse, ReadinessResponse
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live", response_model=HealthResponse)
+def live():
+    return {"success": True, "data": {"status": "alive"}, "error": None}
+
+
+@router.get("/ready", response_model=ReadinessResponse)
+def ready(response: Response):
+    is_ready = model_registry.ready()
+
+    if not is_ready:
+        response.status_code = 503
+
+    return {"success": is_ready, "data": {"ready": is_ready, "models": model_registry.status()}, "error": None}
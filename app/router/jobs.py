@@ -0,0 +1,57 @@
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.pipeline import resolve_tasks
+from app.dependencies import get_current_user, get_db
+from app.models.job import AnalysisJob
+from app.repository.jobs import count_active_jobs, create_job, get_job, get_job_results
+from app.schemas.analysis import AnalysisBatchBase
+from app.schemas.job import JobResponse
+from app.schemas.user import User
+from app.worker import job_queue
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def job_data(job: AnalysisJob, results: List[dict] | None = None) -> dict:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "total": job.total,
+        "completed": job.completed,
+        "attempts": job.attempts,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+        "results": results,
+    }
+
+
+@router.post("", response_model=JobResponse)
+async def submit_job(data: AnalysisBatchBase, current_user: User = Depends(get_current_user),
+                     db: AsyncSession = Depends(get_db)):
+    if await db.run_sync(count_active_jobs, user_id=current_user.id) >= settings.JOB_MAX_ACTIVE_PER_USER:
+        raise HTTPException(status_code=429, detail={"error_message": "Too many active jobs, try again later"})
+
+    resolve_tasks(data.tasks)
+    job = await db.run_sync(create_job, user_id=current_user.id, params=data)
+    job_queue.put(job.id)
+
+    return {"success": True, "data": job_data(job), "error": None}
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job_status(job_id: UUID, current_user: User = Depends(get_current_user),
+                         db: AsyncSession = Depends(get_db)):
+    job = await db.run_sync(get_job, user_id=current_user.id, job_id=job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail={"error_message": "Job not found"})
+
+    results = await db.run_sync(get_job_results, job_id=job.id)
+
+    return {"success": True, "data": job_data(job, results), "error": None}
@@ -2,28 +2,32 @@ from typing import List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.security import get_password_hash
 from app.dependencies import get_db, get_current_user
-from app.repository.user import create_user, get_user_by_email, get_user_by_id, get_users
+from app.repository.user import create_user, get_user_by_email, get_user_by_id, get_users, deactivate_user
 from app.schemas.user import UserCreate, User
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.post("/create", response_model=User)
-def create_new_user(user: UserCreate, db: Session = Depends(get_db)):
-    is_user_exist = get_user_by_email(db, email=user.email)
+async def create_new_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    is_user_exist = await db.run_sync(get_user_by_email, email=user.email)
 
     if is_user_exist:
         raise HTTPException(status_code=400, detail={"error_message": "Email already registered"})
 
-    return create_user(db, user)
+    hashed_password = await run_in_threadpool(get_password_hash, user.password)
+
+    return await db.run_sync(create_user, user, hashed_password)
 
 
 @router.get("/all", response_model=List[User])
-def get_all_users(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    users_list = get_users(db)
+async def get_all_users(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    users_list = await db.run_sync(get_users)
 
     if len(users_list) == 0:
         raise HTTPException(status_code=200, detail={"message": "Users not found"})
@@ -31,9 +35,19 @@ def get_all_users(db: Session = Depends(get_db), current_user: User = Depends(ge
     return users_list
 
 
+@router.post("/me/deactivate", response_model=User)
+async def deactivate_current_user(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    user = await db.run_sync(deactivate_user, user_id=current_user.id)
+
+    if user is None:
+        raise HTTPException(status_code=400, detail={"error_message": "User not found"})
+
+    return user
+
+
 @router.get("/{user_id}", response_model=User)
-def get_user(user_id: UUID, db: Session = Depends(get_db)):
-    user = get_user_by_id(db, user_id=user_id)
+async def get_user(user_id: UUID, db: AsyncSession = Depends(get_db)):
+    user = await db.run_sync(get_user_by_id, user_id=user_id)
 
     if user is None:
         raise HTTPException(status_code=400, detail={"error_message": "User not found"})
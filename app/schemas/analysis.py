@@ -1,35 +1,51 @@
-from typing import List
+from datetime import datetime, timezone
+from typing import Dict, List, Literal
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
+
+from app.core.config import settings
 
 
 class AnalysisBase(BaseModel):
     corpus: str
 
 
-class LabelAndProb(BaseModel):
-    id: UUID
-    corpus_id: UUID
+AnalysisTask = Literal["sentiment", "pii", "ner", "pos", "key_phrases"]
+
+
+class AnalysisRequest(AnalysisBase):
+    tasks: List[AnalysisTask] | None = Field(None, min_length=1)
+    persist: bool = True
+
+
+class TokenLabel(BaseModel):
     token: str
     label: str
     prob: float
+    start: int | None = None
+    end: int | None = None
 
     class Config:
         orm_mode = True
         from_attributes = True
 
 
+class LabelAndProb(TokenLabel):
+    id: UUID
+    corpus_id: UUID
+
+
 class PIIResponse(AnalysisBase):
-    labels: List[LabelAndProb]
+    labels: List[TokenLabel]
 
 
 class NERResponse(AnalysisBase):
-    labels: List[LabelAndProb]
+    labels: List[TokenLabel]
 
 
 class POSResponse(AnalysisBase):
-    labels: List[LabelAndProb]
+    labels: List[TokenLabel]
 
 
 class KeyPhrases(BaseModel):
@@ -40,12 +56,13 @@ class KeyPhrases(BaseModel):
 class SentimentResponse(AnalysisBase):
     corpus_id: UUID
     corpus: str
-    sentiment: str
-    prob: float
-    pii_labels: List[LabelAndProb]
-    ner_labels: List[LabelAndProb]
-    pos_labels: List[LabelAndProb]
-    key_phrases: List[KeyPhrases]
+    created_at: datetime | None = None
+    sentiment: str | None = None
+    prob: float | None = None
+    pii_labels: List[LabelAndProb] | None = None
+    ner_labels: List[LabelAndProb] | None = None
+    pos_labels: List[LabelAndProb] | None = None
+    key_phrases: List[KeyPhrases] | None = None
 
     class Config:
         orm_mode = True
@@ -58,19 +75,64 @@ class AnalysisResponse(BaseModel):
     error: None | dict
 
 
+class AnalysisBatchBase(BaseModel):
+    corpora: List[str]
+    tasks: List[AnalysisTask] | None = Field(None, min_length=1)
+    persist: bool = True
+
+
+class AnalysisBatchItem(BaseModel):
+    success: bool
+    data: SentimentResponse | None
+    error: None | dict
+
+
+class AnalysisBatchResponse(BaseModel):
+    success: bool
+    data: List[AnalysisBatchItem] | None
+    error: None | dict
+
+
+def naive_utc(value: datetime | None) -> datetime | None:
+    if value is None or value.tzinfo is None:
+        return value
+
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class AnalysisPageParams(BaseModel):
+    limit: int = Field(settings.PAGE_DEFAULT_SIZE, ge=1, le=settings.PAGE_MAX_SIZE)
+    cursor: str | None = None
+    sentiment: str | None = None
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+
+    _naive_utc = field_validator("created_after", "created_before")(naive_utc)
+
+
+class AnalysisSearchParams(AnalysisPageParams):
+    q: str | None = None
+    task: Literal["ner", "pii"] = "ner"
+    label: str | None = None
+    token: str | None = None
+
+
 class AnalysisResponseList(BaseModel):
     success: bool
     data: List[SentimentResponse] | None
+    next_cursor: str | None = None
     error: None | dict
 
 
 class AnalysisHistory(AnalysisBase):
     corpus_id: UUID
+    created_at: datetime | None = None
 
 
 class AnalysisHistoryResponse(BaseModel):
     success: bool
     data: List[AnalysisHistory] | None
+    next_cursor: str | None = None
     error: None | dict
 
 
@@ -82,3 +144,88 @@ class AnalysisInfoResponse(BaseModel):
     success: bool
     data: SentimentResponse | None
     error: None | dict
+
+
+class BatchingStats(BaseModel):
+    batches: int
+    items: int
+    avg_batch_size: float
+    max_batch_size: int
+    avg_queue_wait_ms: float
+    max_queue_wait_ms: float
+    real_tokens: int
+    padded_tokens: int
+    padding_efficiency: float
+
+
+class BatchingStatsResponse(BaseModel):
+    success: bool
+    data: Dict[str, BatchingStats] | None
+    error: None | dict
+
+
+class CacheStats(BaseModel):
+    memory_hits: int
+    persistent_hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: int
+
+
+class CacheStatsResponse(BaseModel):
+    success: bool
+    data: CacheStats | None
+    error: None | dict
+
+
+class AnalysisStatsParams(BaseModel):
+    bucket: Literal["hour", "day", "week", "month"] = "day"
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+    top: int = Field(10, ge=1, le=100)
+
+    _naive_utc = field_validator("created_after", "created_before")(naive_utc)
+
+
+class EntityCount(BaseModel):
+    label: str
+    token: str
+    count: int
+
+
+class StatsBucket(BaseModel):
+    bucket: datetime
+    analyses: int
+    pii_analyses: int
+    sentiments: Dict[str, int]
+
+
+class AnalysisStats(BaseModel):
+    analyses: int
+    sentiments: Dict[str, int]
+    pii_hit_rate: float | None
+    pii_labels: Dict[str, float]
+    top_entities: List[EntityCount]
+    buckets: List[StatsBucket]
+
+
+class AnalysisStatsResponse(BaseModel):
+    success: bool
+    data: AnalysisStats | None
+    error: None | dict
+
+
+class AdmissionStats(BaseModel):
+    pending: int
+    capacity: int
+    max_concurrency: int
+    completed: int
+    rejected: int
+    avg_service_ms: float
+
+
+class AdmissionStatsResponse(BaseModel):
+    success: bool
+    data: Dict[str, AdmissionStats] | None
+    error: None | dict
@@ -0,0 +1,30 @@
+from typing import Dict
+
+from pydantic import BaseModel
+
+
+class LiveStatus(BaseModel):
+    status: str
+
+
+class HealthResponse(BaseModel):
+    success: bool
+    data: LiveStatus | None
+    error: None | dict
+
+
+class ModelStatus(BaseModel):
+    enabled: bool
+    loaded: bool
+    memory_bytes: int
+
+
+class ReadinessStatus(BaseModel):
+    ready: bool
+    models: Dict[str, ModelStatus]
+
+
+class ReadinessResponse(BaseModel):
+    success: bool
+    data: ReadinessStatus | None
+    error: None | dict
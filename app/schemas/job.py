@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import List
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.schemas.analysis import AnalysisBatchItem
+
+
+class Job(BaseModel):
+    id: UUID
+    status: str
+    total: int
+    completed: int
+    attempts: int
+    error: str | None
+    created_at: datetime
+    updated_at: datetime
+    results: List[AnalysisBatchItem] | None = None
+
+
+class JobResponse(BaseModel):
+    success: bool
+    data: Job | None
+    error: None | dict
@@ -1,3 +1,4 @@
+from typing import Dict
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -35,3 +36,18 @@ class AuthResponse(BaseModel):
     success: bool
     data: NewUser | None
     error: None | dict
+
+
+class AuthCacheStats(BaseModel):
+    hits: int
+    misses: int
+    expirations: int
+    evictions: int
+    size: int
+    max_size: int
+
+
+class AuthCacheStatsResponse(BaseModel):
+    success: bool
+    data: Dict[str, AuthCacheStats] | None
+    error: None | dict
@@ -0,0 +1,81 @@
+import argparse
+import logging
+import threading
+from typing import List
+
+from app.core.config import settings
+from app.core.jobs import create_job_queue
+from app.db.database import SessionLocal
+from app.models.job import AnalysisJob
+from app.repository.analysis import analyze_batch, batch_item
+from app.repository.jobs import claim_job, complete_job, retry_or_fail_job, save_job_progress
+from app.schemas.analysis import AnalysisBatchBase, AnalysisBatchItem
+
+logger = logging.getLogger(__name__)
+
+job_queue = create_job_queue(settings.JOB_QUEUE)
+
+MAX_BACKOFF_SECONDS = 30.0
+
+
+def run_job(db, job: AnalysisJob):
+    params = AnalysisBatchBase(**job.params)
+
+    try:
+        for start in range(job.completed, len(params.corpora), settings.BATCH_MAX_SIZE):
+            chunk = params.model_copy(update={"corpora": params.corpora[start:start + settings.BATCH_MAX_SIZE]})
+            records = analyze_batch(db, chunk, job.user_id)
+            save_job_progress(db, job, serialize_records(records))
+
+        complete_job(db, job)
+    except Exception as exc:
+        db.rollback()
+        retry_or_fail_job(db, job, str(exc))
+
+
+def serialize_records(records: list) -> List[dict]:
+    return [
+        AnalysisBatchItem.model_validate(batch_item(record), from_attributes=True).model_dump(mode="json")
+        for record in records
+    ]
+
+
+def work(stop_event: threading.Event):
+    job_id = None
+    backoff = settings.JOB_POLL_INTERVAL
+
+    while not stop_event.is_set():
+        try:
+            with SessionLocal() as db:
+                job = claim_job(db, job_id)
+                if job is not None:
+                    run_job(db, job)
+        except Exception:
+            logger.exception("Job worker failed to claim or run a job, retrying in %.1fs", backoff)
+            stop_event.wait(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+            continue
+
+        backoff = settings.JOB_POLL_INTERVAL
+        job_id = None if job is not None else job_queue.take(settings.JOB_POLL_INTERVAL)
+
+
+def start_workers(count: int = settings.JOB_WORKERS) -> threading.Event:
+    stop_event = threading.Event()
+
+    for index in range(count):
+        threading.Thread(target=work, args=(stop_event,), name=f"job-worker-{index}", daemon=True).start()
+
+    return stop_event
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run analysis job workers against the database job queue")
+    parser.add_argument("--workers", type=int, default=settings.JOB_WORKERS)
+    args = parser.parse_args()
+
+    stop = start_workers(args.workers)
+    try:
+        stop.wait()
+    except KeyboardInterrupt:
+        stop.set()
@@ -0,0 +1,34 @@
+import gc
+import os
+
+from app.core.config import settings
+
+bind = "0.0.0.0:8000"
+workers = settings.WEB_WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+
+def when_ready(server):
+    from app.core.registry import model_registry
+
+    for name in model_registry.loaders:
+        if model_registry.enabled(name) and getattr(settings, f"{name.upper()}_BACKEND") != "onnx":
+            model_registry.get(name)
+
+    gc.collect()
+    gc.freeze()
+    server.log.info("Loaded %s in the master process", ", ".join(model_registry.loaded()))
+
+
+def post_fork(server, worker):
+    import torch
+
+    from app.db.database import async_engine, engine
+
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+    threads = settings.TORCH_THREADS_PER_WORKER or max(1, (os.cpu_count() or 1) // settings.WEB_WORKERS)
+    torch.set_num_threads(threads)
+    server.log.info("Worker %s using %s torch threads", worker.pid, threads)
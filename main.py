@@ -1,9 +1,18 @@
-from fastapi import FastAPI
+import threading
+import time
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from app.core.admission import AdmissionRejected
 from app.core.config import settings
+from app.core.key_phrases import load_rake
+from app.core.registry import ModelDisabledError, model_registry
+from app.core.telemetry import http_request_seconds, start_span
 from app.db.database import Base, engine
-from app.router import users, auth, analysis
+from app.router import users, auth, analysis, health, jobs, metrics
+from app.worker import start_workers
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -25,5 +34,50 @@ app.add_middleware(
 app.include_router(users.router)
 app.include_router(auth.router)
 app.include_router(analysis.router)
+app.include_router(health.router)
+app.include_router(jobs.router)
+app.include_router(metrics.router)
 
 Base.metadata.create_all(bind=engine)
+
+
+@app.exception_handler(AdmissionRejected)
+def admission_rejected(request: Request, exc: AdmissionRejected):
+    return JSONResponse(status_code=429, content={"detail": {"error_message": str(exc)}},
+                        headers={"Retry-After": str(exc.retry_after)})
+
+
+@app.exception_handler(ModelDisabledError)
+def model_disabled(request: Request, exc: ModelDisabledError):
+    return JSONResponse(status_code=503, content={"detail": {"error_message": str(exc)}})
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+
+    with start_span(f"{request.method} {request.url.path}", method=request.method, path=request.url.path):
+        response = await call_next(request)
+
+    route = request.scope.get("route")
+    http_request_seconds.observe(time.perf_counter() - start, method=request.method,
+                                 route=route.path if route is not None else "unmatched", status=response.status_code)
+
+    return response
+
+
+@app.on_event("startup")
+def load_key_phrase_resources():
+    load_rake()
+
+
+@app.on_event("startup")
+def warmup_models():
+    if settings.WARMUP_MODELS:
+        threading.Thread(target=model_registry.warmup, name="model-warmup", daemon=True).start()
+
+
+@app.on_event("startup")
+def start_job_workers():
+    if settings.JOB_QUEUE == "inprocess":
+        start_workers()
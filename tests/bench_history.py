@@ -0,0 +1,122 @@
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import event, func, insert
+
+from app.db.database import Base, SessionLocal, engine
+from app.models.analysis import Sentiment
+from app.models.user import User
+from app.repository.analysis import get_analysis_history
+from app.schemas.analysis import AnalysisPageParams
+
+HISTORY_INDEX = "ix_sentiments_user_id_created_at"
+EXPLAIN_PREFIXES = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+
+
+def seed(rows: int, users: int, chunk_size: int) -> None:
+    user_ids = [uuid4() for _ in range(users)]
+    started = datetime.utcnow() - timedelta(days=365)
+
+    with SessionLocal() as db:
+        db.execute(insert(User.__table__), [
+            {"id": user_id, "email": f"history-{user_id}@example.com", "hashed_password": "unused", "is_active": True}
+            for user_id in user_ids
+        ])
+
+        for offset in range(0, rows, chunk_size):
+            db.execute(insert(Sentiment.__table__), [
+                {"corpus_id": uuid4(), "corpus": f"seeded analysis {index}", "corpus_hash": f"{index:064x}",
+                 "user_id": user_ids[index % users], "created_at": started + timedelta(seconds=index * 30),
+                 "sentiment": "neutral", "prob": 90.0}
+                for index in range(offset, min(offset + chunk_size, rows))
+            ])
+            db.commit()
+            print(f"seeded {min(offset + chunk_size, rows)} analyses")
+
+
+def capture_statements(callback) -> list:
+    statements = []
+    listener = lambda conn, cursor, statement, parameters, context, executemany: \
+        statements.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", listener)
+
+    try:
+        callback()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    return statements
+
+
+def explain(statement: str, parameters) -> str:
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(EXPLAIN_PREFIXES[engine.dialect.name] + statement, parameters).all()
+
+    return "\n".join(" ".join(str(column) for column in row) for row in plan)
+
+
+def time_page(user_id: UUID, params: AnalysisPageParams, runs: int) -> Tuple[float, str | None]:
+    timings = []
+    next_cursor = None
+
+    with SessionLocal() as db:
+        for _ in range(runs):
+            start = time.perf_counter()
+            rows, next_cursor = get_analysis_history(db, user_id, params)
+            timings.append(time.perf_counter() - start)
+            db.rollback()
+
+    return statistics.median(timings) * 1000, next_cursor
+
+
+def run_benchmark(rows: int, users: int, chunk_size: int, runs: int, limit: int, max_ms: float):
+    Base.metadata.create_all(bind=engine)
+
+    with SessionLocal() as db:
+        existing = db.query(func.count(Sentiment.corpus_id)).scalar()
+    if existing < rows:
+        seed(rows - existing, users, chunk_size)
+
+    with SessionLocal() as db:
+        user_id = db.query(Sentiment.user_id).filter(Sentiment.user_id.isnot(None)).group_by(Sentiment.user_id) \
+            .order_by(func.count().desc()).limit(1).scalar()
+
+    first_page = AnalysisPageParams(limit=limit)
+    _, next_cursor = time_page(user_id, first_page, 1)
+    pages = [("first page", first_page), ("second page", AnalysisPageParams(limit=limit, cursor=next_cursor))]
+
+    failures = []
+    for name, params in pages:
+        statements = capture_statements(lambda: time_page(user_id, params, 1))
+        statement, parameters = next((statement, parameters) for statement, parameters in statements
+                                     if "FROM sentiments" in statement)
+        plan = explain(statement, parameters)
+        elapsed, _ = time_page(user_id, params, runs)
+
+        print(f"{name}: {elapsed:.2f} ms median over {runs} runs")
+        print(plan)
+        if HISTORY_INDEX not in plan:
+            failures.append(f"{name} does not use {HISTORY_INDEX}")
+        if elapsed > max_ms:
+            failures.append(f"{name} took {elapsed:.2f} ms, over the {max_ms} ms budget")
+
+    if failures:
+        raise SystemExit("\n".join(failures))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Seed a large sentiments table and check that a per-user history page stays on the index")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--max-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, args.users, args.chunk_size, args.runs, args.limit, args.max_ms)
@@ -0,0 +1,89 @@
+import argparse
+import statistics
+import time
+from uuid import UUID
+
+from app.core.cache import hash_corpus
+from app.db.database import Base, SessionLocal, engine
+from app.models.analysis import Sentiment, PII, NER, POS, KeyPhrases
+from app.models.user import User
+from app.repository.analysis import build_analysis, save_analyses
+
+LABEL_TABLES = (("pii_labels", PII), ("ner_labels", NER), ("pos_labels", POS))
+
+
+def analysis_results(corpus: str) -> dict:
+    labels = []
+    start = 0
+    for word in corpus.split():
+        start = corpus.index(word, start)
+        labels.append({"token": word, "label": "O", "prob": 99.0, "start": start, "end": start + len(word)})
+        start += len(word)
+
+    return {"sentiment": ("neutral", 90.0), "pii_labels": labels, "ner_labels": labels, "pos_labels": labels,
+            "key_phrases": [{"score": float(index), "phrase": f"phrase {index}"} for index in range(5)]}
+
+
+def save_analysis_per_row(db, analysis: dict) -> None:
+    sentiment = Sentiment(corpus_id=analysis["corpus_id"], corpus=analysis["corpus"],
+                          corpus_hash=analysis["corpus_hash"], user_id=analysis["user_id"],
+                          sentiment=analysis["sentiment"], prob=analysis["prob"])
+    db.add(sentiment)
+    db.commit()
+    db.refresh(sentiment)
+
+    for key, model in LABEL_TABLES:
+        for label in analysis[key]:
+            db.add(model(**{column: value for column, value in label.items() if column != "id"}))
+        db.commit()
+        db.refresh(sentiment)
+
+    for phrase in analysis["key_phrases"]:
+        db.add(KeyPhrases(corpus_id=phrase["corpus_id"], phrase=phrase["phrase"], score=phrase["score"]))
+    db.commit()
+    db.refresh(sentiment)
+
+
+def time_writes(user_id: UUID, tokens: int, runs: int, bulk: bool) -> float:
+    timings = []
+
+    with SessionLocal() as db:
+        for run in range(runs):
+            corpus = " ".join(f"word{run}x{index}" for index in range(tokens))
+            analysis = build_analysis(corpus, hash_corpus(corpus), user_id, analysis_results(corpus))
+
+            start = time.perf_counter()
+            if bulk:
+                save_analyses(db, [analysis])
+            else:
+                save_analysis_per_row(db, analysis)
+            timings.append(time.perf_counter() - start)
+            db.expunge_all()
+
+    return statistics.median(timings) * 1000
+
+
+def run_benchmark(token_counts: list, runs: int):
+    Base.metadata.create_all(bind=engine)
+
+    with SessionLocal() as db:
+        user = User(email=f"bench-{time.time_ns()}@example.com", hashed_password="unused")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+    print(f"{'tokens':>8} {'per-row ORM':>14} {'save_analyses':>14} {'speedup':>8}")
+    for tokens in token_counts:
+        per_row = time_writes(user_id, tokens, runs, bulk=False)
+        bulk = time_writes(user_id, tokens, runs, bulk=True)
+        print(f"{tokens:>8} {per_row:>11.1f} ms {bulk:>11.1f} ms {per_row / bulk:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare write time per analysis for save_analyses against the old per-row ORM path")
+    parser.add_argument("--tokens", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    run_benchmark(args.tokens, args.runs)
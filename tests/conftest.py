@@ -0,0 +1,17 @@
+import os
+import tempfile
+
+TEST_DATABASE_DIR = tempfile.mkdtemp()
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DATABASE_DIR, 'test.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["JOB_QUEUE"] = "database"
+os.environ["WARMUP_MODELS"] = "false"
+
+for variable in ("SENTIMENT_MODEL_PATH", "SENTIMENT_TOKENIZER_PATH", "NER_MODEL_PATH", "NER_TOKENIZER_PATH",
+                 "PII_MODEL_PATH", "PII_TOKENIZER_PATH", "POS_MODEL_PATH", "POS_TOKENIZER_PATH"):
+    os.environ.setdefault(variable, "unused")
+
+os.environ.setdefault("PROJECT_NAME", "sentiment-explorer")
+os.environ.setdefault("PROJECT_VERSION", "test")
+os.environ.setdefault("TOKEN_KEY", "test")
@@ -0,0 +1,33 @@
+import json
+import os
+import subprocess
+import sys
+
+IMPORT_BUDGET_SECONDS = 2.0
+HEAVY_MODULES = ("torch", "transformers", "sklearn", "nltk", "cleantext", "numpy")
+
+IMPORT_SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+
+def measure_import() -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-W", "ignore", "-c", IMPORT_SCRIPT], cwd=root, env=os.environ,
+                            capture_output=True, text=True, check=True).stdout
+
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_import_main_stays_within_budget():
+    result = measure_import()
+
+    assert result["elapsed"] < IMPORT_BUDGET_SECONDS
+
+
+def test_import_main_skips_heavy_libraries():
+    assert measure_import()["loaded"] == []
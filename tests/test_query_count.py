@@ -0,0 +1,64 @@
+from uuid import UUID
+
+import pytest
+from sqlalchemy import event
+
+from app.core.cache import hash_corpus
+from app.db.database import Base, SessionLocal, engine
+from app.models.user import User
+from app.repository.analysis import build_analysis, get_sentiments_list, save_analyses
+from app.schemas.analysis import AnalysisPageParams, AnalysisResponseList
+
+CORPUS = "John Smith lives in London"
+
+
+def analysis_results(corpus: str) -> dict:
+    labels = [{"token": word, "label": "O", "prob": 99.0, "start": corpus.index(word),
+               "end": corpus.index(word) + len(word)} for word in corpus.split()]
+
+    return {"sentiment": ("neutral", 90.0), "pii_labels": labels, "ner_labels": labels, "pos_labels": labels,
+            "key_phrases": [{"score": 1.0, "phrase": corpus}]}
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as session:
+        yield session
+
+
+def create_user_with_analyses(db, email: str, count: int) -> UUID:
+    user = User(email=email, hashed_password="unused")
+    db.add(user)
+    db.commit()
+
+    corpora = [f"{CORPUS} {index}" for index in range(count)]
+    save_analyses(db, [build_analysis(corpus, hash_corpus(corpus), user.id, analysis_results(corpus))
+                       for corpus in corpora])
+
+    return user.id
+
+
+def count_list_queries(db, user_id: UUID) -> int:
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+
+    try:
+        data, next_cursor = get_sentiments_list(db, user_id, AnalysisPageParams(limit=200))
+        AnalysisResponseList.model_validate({"success": True, "data": data, "next_cursor": next_cursor,
+                                             "error": None}, from_attributes=True)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert len(data) > 0
+
+    return len(statements)
+
+
+def test_sentiments_list_query_count_is_independent_of_row_count(db):
+    few = create_user_with_analyses(db, "few@example.com", 2)
+    many = create_user_with_analyses(db, "many@example.com", 40)
+    db.expunge_all()
+
+    assert count_list_queries(db, few) == count_list_queries(db, many) == 6